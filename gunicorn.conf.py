@@ -0,0 +1,18 @@
+# Gunicorn configuration for running Paulander on the Raspberry Pi
+#   uv run gunicorn -c gunicorn.conf.py wsgi:application
+
+bind = '0.0.0.0:5000'
+
+# Exactly one worker: it owns the GPIO/SPI/I2C hardware and the background
+# scheduler. Threads keep the web interface responsive while a CalDAV,
+# weather or Gemini call is in flight.
+workers = 1
+worker_class = 'gthread'
+threads = 8
+
+# Display refreshes run on the scheduler, but give slow upstream APIs room
+timeout = 120
+
+# Don't preload: the scheduler thread is started on import and would stay
+# behind in the master process instead of running in the worker.
+preload_app = False
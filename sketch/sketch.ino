@@ -91,6 +91,8 @@ void setup() {
 
   // Initialize I2C first with explicit parameters (like your working test)
   Serial.println("Initializing I2C slave communication...");
+  // Receive a whole JSON message in one transaction instead of 128 byte pieces
+  Wire.setBufferSize(sizeof(i2cBuffer));
   Wire.begin(I2C_ADDRESS, I2C_SDA, I2C_SCL, 100000);  // Address, SDA, SCL, Frequency
   Wire.onReceive(onI2CReceive);
   Wire.onRequest(onI2CRequest);
@@ -1,24 +1,51 @@
+import logging
 import os
+from types import SimpleNamespace
 from dotenv import load_dotenv
 from flask import Flask
 from flask_cors import CORS
-from apscheduler.schedulers.background import BackgroundScheduler
 from src.routes.api import api_bp
 from src.routes.web import web_bp
-from src.services.scheduler import SchedulerService
 
 load_dotenv()
 
-app = Flask(__name__, static_folder='../static', template_folder='../templates')
-app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+# APScheduler logs every job run at INFO
+logging.getLogger('apscheduler').setLevel(logging.WARNING)
 
-CORS(app)
+def create_app() -> Flask:
+    """Create the Flask app, its services and the background scheduler"""
+    # Imported here so importing the blueprints (e.g. `flask routes`) doesn't
+    # pull in the display stack
+    from src.services.calendar_service import CalendarService
+    from src.services.config_service import config_service
+    from src.services.scheduler import SchedulerService
+    from src.services.weather_service import WeatherService
 
-app.register_blueprint(api_bp, url_prefix='/api')
-app.register_blueprint(web_bp)
+    app = Flask(__name__, static_folder='../static', template_folder='../templates')
+    app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key')
 
-scheduler = SchedulerService()
-scheduler.start()  # Start scheduler immediately when app loads
+    CORS(app)
+
+    app.register_blueprint(api_bp, url_prefix='/api')
+    app.register_blueprint(web_bp)
+
+    scheduler = SchedulerService()
+    scheduler.start()  # Start scheduler immediately when app loads
+    # Used by the API to queue manual refreshes and to reach the display
+    # service, which the scheduler only loads on first use
+    app.extensions['scheduler'] = scheduler
+
+    # Services used by the API routes
+    app.extensions['services'] = SimpleNamespace(
+        config=config_service,
+        calendar=CalendarService(),
+        weather=WeatherService(),
+    )
+
+    return app
+
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=os.getenv('FLASK_ENV') == 'development')
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=os.getenv('FLASK_ENV') == 'development')
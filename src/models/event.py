@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+@dataclass(slots=True)
+class Event:
+    """A calendar event (one occurrence of a recurring event)"""
+    id: str
+    title: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+    location: Optional[str]
+    description: Optional[str]
+    all_day: bool
@@ -1,25 +1,74 @@
-from flask import Blueprint, request, jsonify, send_file
-from PIL import Image, ImageDraw
-from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify, send_file
+from dataclasses import asdict
+from functools import wraps
 import subprocess
-import os
-from src.services.calendar_service import CalendarService
-from src.services.weather_service import WeatherService
-from src.services.config_service import ConfigService
-from src.services.display_service import DisplayService
+import threading
+import time
 
 api_bp = Blueprint('api', __name__)
 
-config_service = ConfigService()
-calendar_service = CalendarService()
-weather_service = WeatherService()
-display_service = DisplayService()
+def _services():
+    """Services built by create_app() (config, calendar, weather)"""
+    return current_app.extensions['services']
+
+def _display_service():
+    """The DisplayService shared with the scheduler (loaded on first use)"""
+    return current_app.extensions['scheduler'].display_service
+
+# Short-lived cache for the iCloud-backed calendar endpoint (WeatherService
+# caches OpenWeather responses itself). Cleared when the config changes.
+# Maps (endpoint, query args) -> (monotonic timestamp, response body).
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+
+def cached_response(ttl_key: str, default_ttl: int):
+    """Cache a JSON endpoint for the TTL configured under `ttl_key`.
+
+    The wrapped view returns the response body. A body containing an 'error'
+    key counts as an upstream failure: it is never cached, and if a previous
+    good body exists it is served instead with an `X-Cache: STALE` header.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (request.endpoint, tuple(sorted(request.args.items(multi=True))))
+            ttl = _services().config.get(ttl_key, default_ttl)
+            with _response_cache_lock:
+                entry = _response_cache.get(key)
+
+            if entry and time.monotonic() - entry[0] < ttl:
+                response = jsonify(entry[1])
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            try:
+                body = view(*args, **kwargs)
+                error = body.get('error') if isinstance(body, dict) else None
+            except Exception as e:
+                body, error = None, str(e)
+
+            if error is None:
+                with _response_cache_lock:
+                    _response_cache[key] = (time.monotonic(), body)
+                response = jsonify(body)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+
+            if entry:
+                response = jsonify(entry[1])
+                response.headers['X-Cache'] = 'STALE'
+                return response
+            if body is not None:
+                return jsonify(body)
+            return jsonify({'error': error}), 500
+        return wrapper
+    return decorator
 
 @api_bp.route('/config', methods=['GET'])
 def get_config():
     """Get current configuration"""
     try:
-        config = config_service.get_config()
+        config = _services().config.get_config()
         return jsonify(config)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -29,7 +78,11 @@ def update_config():
     """Update configuration"""
     try:
         data = request.get_json()
-        config_service.update_config(data)
+        _services().config.update_config(data)
+        # The location, API keys or credentials may have changed
+        with _response_cache_lock:
+            _response_cache.clear()
+        _services().weather.clear_cache()
         return jsonify({'message': 'Configuration updated successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -38,7 +91,7 @@ def update_config():
 def get_default_prompt():
     """Get default AI prompt template"""
     try:
-        return jsonify({'ai_prompt_template': config_service.default_config['ai_prompt_template']})
+        return jsonify({'ai_prompt_template': _services().config.default_config['ai_prompt_template']})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -49,46 +102,53 @@ def test_calendar():
         data = request.get_json()
         apple_id = data.get('apple_id')
         app_password = data.get('app_password')
+        list_calendars = bool(data.get('list_calendars', False))
         
-        result = calendar_service.test_connection(apple_id, app_password)
+        result = _services().calendar.test_connection(apple_id, app_password, list_calendars)
         return jsonify({'success': result['success'], 'message': result['message']})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @api_bp.route('/calendar/events', methods=['GET'])
+@cached_response('calendar_cache_ttl', 120)
 def get_calendar_events():
     """Get upcoming calendar events"""
-    try:
-        events = calendar_service.get_upcoming_events()
-        return jsonify({'events': events})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    events = _services().calendar.get_upcoming_events()
+    return {'events': [asdict(event) for event in events]}
 
 @api_bp.route('/weather', methods=['GET'])
 def get_weather():
     """Get current weather data"""
-    try:
-        weather = weather_service.get_current_weather()
-        return jsonify(weather)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return _services().weather.get_current_weather()
 
 @api_bp.route('/weather/forecast', methods=['GET'])
 def get_weather_forecast():
     """Get weather forecast"""
+    return _services().weather.get_forecast()
+
+@api_bp.route('/display/refresh', methods=['POST'])
+def refresh_display():
+    """Queue a manual display refresh in the background"""
     try:
-        forecast = weather_service.get_forecast()
-        return jsonify(forecast)
+        data = request.get_json()
+        display_type = data.get('type', 'both')
+        if display_type not in ('color', 'bw', 'both'):
+            return jsonify({'error': 'Invalid display type'}), 400
+        # no_cache forces a freshly generated color image instead of today's cached one
+        use_cache = not data.get('no_cache', False)
+        job_id = current_app.extensions['scheduler'].submit_display_refresh(display_type, use_cache)
+        return jsonify({'job_id': job_id}), 202
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@api_bp.route('/display/refresh', methods=['POST'])
-def refresh_display():
-    """Manually refresh displays"""
+@api_bp.route('/display/jobs/<job_id>', methods=['GET'])
+def get_display_job(job_id):
+    """Get the status of a queued manual display refresh"""
     try:
-        display_type = request.get_json().get('type', 'both')
-        result = display_service.refresh_display(display_type)
-        return jsonify(result)
+        job = current_app.extensions['scheduler'].get_display_refresh(job_id)
+        if not job:
+            return jsonify({'error': 'Unknown job'}), 404
+        return jsonify(job)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -98,7 +158,7 @@ def get_display_image(display_type):
     try:
         if display_type != 'color':
             return jsonify({'error': 'Invalid display type'}), 400
-        path = display_service.get_output_image_path(display_type)
+        path = _display_service().get_output_image_path(display_type)
         if not path:
             return jsonify({'error': 'No rendered image available yet'}), 404
         response = send_file(path, mimetype='image/png')
@@ -112,7 +172,7 @@ def get_display_image(display_type):
 def get_display_status():
     """Get display status"""
     try:
-        status = display_service.get_status()
+        status = _display_service().get_status()
         return jsonify(status)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,73 @@
+import json
+import logging
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class CacheService:
+    """Small TTL key/value store shared by the web worker, the scheduler and CLI tools"""
+
+    def __init__(self, db_file: str = 'cache.db'):
+        self.db_file = db_file
+        try:
+            with self._connect() as conn:
+                # WAL lets readers proceed while a refresh job is writing
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS cache ('
+                    'key TEXT PRIMARY KEY, ts REAL NOT NULL, ttl REAL, blob BLOB NOT NULL)'
+                )
+        except sqlite3.Error as e:
+            logger.warning("✗ Error initializing cache database: %s", e)
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection for one transaction and close it afterwards"""
+        # A connection per call keeps this safe to use from any thread.
+        # The connection's own context manager only commits or rolls back,
+        # closing() releases the database (and WAL) file handles right away
+        with closing(sqlite3.connect(self.db_file, timeout=5)) as conn:
+            with conn:
+                yield conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute('SELECT ts, ttl, blob FROM cache WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("✗ Error reading cache entry '%s': %s", key, e)
+            return None
+
+        if row is None:
+            return None
+        ts, ttl, blob = row
+        if ttl is not None and time.time() - ts >= ttl:
+            return None
+        try:
+            return json.loads(blob)
+        except ValueError:
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a JSON-serializable value, expiring after ttl seconds (never if None)"""
+        try:
+            blob = json.dumps(value)
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache (key, ts, ttl, blob) VALUES (?, ?, ?, ?)',
+                    (key, time.time(), ttl, blob)
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning("✗ Error writing cache entry '%s': %s", key, e)
+
+    def delete(self, key: str):
+        """Drop a cache entry"""
+        try:
+            with self._connect() as conn:
+                conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            logger.warning("✗ Error deleting cache entry '%s': %s", key, e)
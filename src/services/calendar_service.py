@@ -1,17 +1,149 @@
 import caldav
-from datetime import datetime, date, timedelta
-import pytz
+from dataclasses import asdict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from icalendar import Calendar
+from datetime import datetime, date, timedelta, timezone
+from functools import lru_cache
+import hashlib
+import logging
+from operator import attrgetter
+import threading
+import time
 from typing import List, Dict, Any
-from src.services.config_service import ConfigService
+from src.models.event import Event
+from src.services.config_service import config_service
+from src.services.cache_service import CacheService
+
+logger = logging.getLogger(__name__)
+
+_UTC = timezone.utc
+# Sort key for events without a start time (always sorted first)
+_MIN_START = datetime.min.replace(tzinfo=_UTC)
+
+def _parse_ical_dt(prop) -> datetime | None:
+    """Parse a datetime/date from an icalendar property"""
+    if prop is None:
+        return None
+    dt = getattr(prop, 'dt', prop)
+    if isinstance(dt, datetime) and dt.tzinfo is not None:
+        # Already what we want - by far the most common case
+        return dt
+    if isinstance(dt, date):
+        return _normalize_dt(dt)
+    return None
+
+@lru_cache(maxsize=1024)
+def _normalize_dt(dt: date) -> datetime:
+    """Make a naive datetime or a date an aware UTC datetime (memoized, recurring
+    and all-day events hand in the same values over and over)"""
+    if isinstance(dt, datetime):
+        return dt.replace(tzinfo=_UTC)
+    # Convert date to datetime at midnight UTC
+    return datetime(dt.year, dt.month, dt.day, tzinfo=_UTC)
+
+def _parse_vevent(component) -> Event:
+    """Map a VEVENT component to an Event"""
+    get = component.get
+    dtstart_prop = get("DTSTART")
+    dtend_prop = get("DTEND")
+    location = get("LOCATION")
+    description = get("DESCRIPTION")
+    
+    # All-day events carry a plain date instead of a datetime
+    start_dt = getattr(dtstart_prop, 'dt', None)
+    all_day = isinstance(start_dt, date) and not isinstance(start_dt, datetime)
+    
+    return Event(
+        id=str(get("UID", "unknown")),
+        title=str(get("SUMMARY", "No Title")),
+        start=_parse_ical_dt(dtstart_prop) if dtstart_prop else None,
+        end=_parse_ical_dt(dtend_prop) if dtend_prop else None,
+        location=str(location) if location else None,
+        description=str(description) if description else None,
+        all_day=all_day
+    )
+
+# calendar-query REPORT (RFC 4791) with server-side recurrence expansion that
+# only returns the VEVENT properties _parse_vevent reads, leaving out alarms,
+# attendees and the X-APPLE-* payload iCloud attaches to every event
+_EVENT_QUERY = """<?xml version="1.0" encoding="utf-8"?>
+<C:calendar-query xmlns:D="DAV:" xmlns:C="urn:ietf:params:xml:ns:caldav">
+  <D:prop>
+    <C:calendar-data>
+      <C:expand start="{start}" end="{end}"/>
+      <C:comp name="VCALENDAR">
+        <C:prop name="VERSION"/>
+        <C:comp name="VEVENT">
+          <C:prop name="UID"/>
+          <C:prop name="SUMMARY"/>
+          <C:prop name="DTSTART"/>
+          <C:prop name="DTEND"/>
+          <C:prop name="LOCATION"/>
+          <C:prop name="DESCRIPTION"/>
+        </C:comp>
+      </C:comp>
+    </C:calendar-data>
+  </D:prop>
+  <C:filter>
+    <C:comp-filter name="VCALENDAR">
+      <C:comp-filter name="VEVENT">
+        <C:time-range start="{start}" end="{end}"/>
+      </C:comp-filter>
+    </C:comp-filter>
+  </C:filter>
+</C:calendar-query>"""
+_CALENDAR_DATA_TAG = '{urn:ietf:params:xml:ns:caldav}calendar-data'
+
+_CTAG_QUERY = """<?xml version="1.0" encoding="utf-8"?>
+<D:propfind xmlns:D="DAV:" xmlns:CS="http://calendarserver.org/ns/">
+  <D:prop>
+    <CS:getctag/>
+  </D:prop>
+</D:propfind>"""
+_CTAG_TAG = '{http://calendarserver.org/ns/}getctag'
+
+# Fans out the per-calendar queries; matches the CalDAV session's pool size
+_calendar_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='caldav')
+
+def _serialize_events(events: List[Event]) -> List[Dict[str, Any]]:
+    """Make parsed events JSON-serializable for the disk cache"""
+    return [
+        {**asdict(event),
+         'start': event.start.isoformat() if event.start else None,
+         'end': event.end.isoformat() if event.end else None}
+        for event in events
+    ]
+
+def _deserialize_events(events: List[Dict[str, Any]]) -> List[Event]:
+    """Inverse of _serialize_events"""
+    return [
+        Event(**{**event,
+                 'start': datetime.fromisoformat(event['start']) if event['start'] else None,
+                 'end': datetime.fromisoformat(event['end']) if event['end'] else None})
+        for event in events
+    ]
 
 class CalendarService:
+    # Shared across instances: discovering the principal and its calendars
+    # costs two PROPFIND round-trips to iCloud, so keep the result around.
+    # Maps credentials hash -> (client, calendars, expires_at).
+    _client_cache: Dict[str, tuple] = {}
+    _client_cache_lock = threading.Lock()
+    CLIENT_CACHE_TTL = 1800  # 30 minutes in seconds
+    EVENTS_CACHE_TTL = 120   # 2 minutes in seconds
+    EVENTS_DISK_CACHE_TTL = 86400 * 2  # CTag-validated events, per query window
+
     def __init__(self):
-        self.config_service = ConfigService()
-        self.client = None
-        self.calendar = None
-    
-    def _get_client(self, apple_id: str = None, app_password: str = None):
-        """Get CalDAV client with authentication"""
+        self.config_service = config_service
+        self.cache_service = CacheService()
+        # days_ahead (or 'today') -> (expires_at, events)
+        self._events_cache: Dict[Any, tuple] = {}
+
+    def _get_credentials(self, apple_id: str = None, app_password: str = None) -> tuple:
+        """Resolve credentials, falling back to the stored configuration"""
         if not apple_id:
             apple_id = self.config_service.get('apple_id')
         if not app_password:
@@ -19,6 +151,15 @@ class CalendarService:
             
         if not apple_id or not app_password:
             raise ValueError("Apple ID and App Password are required")
+        return apple_id, app_password
+
+    @staticmethod
+    def _credentials_key(apple_id: str, app_password: str) -> str:
+        return hashlib.sha256(f"{apple_id}\0{app_password}".encode('utf-8')).hexdigest()
+    
+    def _get_client(self, apple_id: str = None, app_password: str = None):
+        """Get CalDAV client with authentication"""
+        apple_id, app_password = self._get_credentials(apple_id, app_password)
         
         # iCloud CalDAV URL
         url = f"https://caldav.icloud.com/"
@@ -29,18 +170,63 @@ class CalendarService:
                 username=apple_id,
                 password=app_password
             )
+            self._configure_session(client)
             return client
         except Exception as e:
             raise Exception(f"Failed to connect to iCloud calendar: {str(e)}")
     
-    def test_connection(self, apple_id: str, app_password: str) -> Dict[str, Any]:
-        """Test calendar connection"""
+    @staticmethod
+    def _configure_session(client):
+        """Pool keep-alive connections to iCloud and retry dropped ones"""
+        session = getattr(client, 'session', None)
+        if isinstance(session, requests.Session):
+            adapter_class, retry_class = HTTPAdapter, Retry
+        else:
+            # Newer caldav releases use niquests, which has the same adapter API
+            # but its own urllib3 fork
+            try:
+                import niquests
+                from niquests.adapters import HTTPAdapter as adapter_class
+                from niquests.packages.urllib3.util.retry import Retry as retry_class
+            except ImportError:
+                niquests = None
+            if niquests is None or not isinstance(session, niquests.Session):
+                logger.warning("Unknown CalDAV session type %s, not pooling connections", type(session).__name__)
+                return
+        # The read-only WebDAV methods are safe to retry on connection errors
+        retry = retry_class(
+            total=2,
+            backoff_factor=0.3,
+            allowed_methods=frozenset({'GET', 'OPTIONS', 'PROPFIND', 'REPORT'})
+        )
+        adapter = adapter_class(pool_connections=1, pool_maxsize=4, max_retries=retry)
+        session.mount('https://', adapter)
+        session.headers['Connection'] = 'keep-alive'
+    
+    def test_connection(self, apple_id: str, app_password: str, list_calendars: bool = False) -> Dict[str, Any]:
+        """Test calendar connection.
+
+        By default only the principal is looked up, a single small PROPFIND
+        that fails on wrong credentials. With list_calendars=True the
+        calendars are enumerated as well (and cached for the next fetch).
+        """
         try:
+            apple_id, app_password = self._get_credentials(apple_id, app_password)
             client = self._get_client(apple_id, app_password)
             principal = client.principal()
+            
+            if not list_calendars:
+                return {
+                    'success': True,
+                    'message': 'Successfully connected!'
+                }
+            
             calendars = principal.calendars()
             
             if calendars:
+                # Keep the result so the next event fetch with these
+                # credentials doesn't repeat the discovery
+                self._cache_client(apple_id, app_password, client, calendars)
                 return {
                     'success': True,
                     'message': f'Successfully connected! Found {len(calendars)} calendar(s).'
@@ -58,155 +244,231 @@ class CalendarService:
             }
     
     def _get_calendars(self) -> list:
-        """Get all calendars"""
-        if not self.client:
-            self.client = self._get_client()
+        """Get all calendars, reusing a cached client and calendar list"""
+        apple_id, app_password = self._get_credentials()
+        key = self._credentials_key(apple_id, app_password)
         
-        principal = self.client.principal()
+        with self._client_cache_lock:
+            cached = self._client_cache.get(key)
+            if cached and cached[2] > time.monotonic():
+                return cached[1]
+        
+        client = self._get_client(apple_id, app_password)
+        principal = client.principal()
         calendars = principal.calendars()
         
         if not calendars:
             raise Exception("No calendars found")
         
+        self._cache_client(apple_id, app_password, client, calendars)
         return calendars
+
+    def _cache_client(self, apple_id: str, app_password: str, client, calendars: list):
+        """Share a connected client and its calendars with all instances"""
+        key = self._credentials_key(apple_id, app_password)
+        with self._client_cache_lock:
+            self._client_cache[key] = (client, calendars, time.monotonic() + self.CLIENT_CACHE_TTL)
+
+    def _invalidate_client_cache(self):
+        """Forget the cached client so the next call re-discovers calendars"""
+        with self._client_cache_lock:
+            self._client_cache.clear()
     
-    def get_upcoming_events(self, days_ahead: int = 7) -> List[Dict[str, Any]]:
-        """Get upcoming events for the next N days from all calendars"""
+    def get_upcoming_events(self, days_ahead: int = 7, raise_errors: bool = False) -> List[Event]:
+        """Get upcoming events for the next N days from all calendars
+
+        Failures return an empty list unless raise_errors is set.
+        """
+        cached = self._events_cache.get(days_ahead)
+        if cached and cached[0] > time.monotonic():
+            return list(cached[1])
+        
         try:
-            calendars = self._get_calendars()
-            
             # Define time range
-            now = datetime.now(pytz.UTC)
+            now = datetime.now(_UTC)
             start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
             end_date = now + timedelta(days=days_ahead)
             
-            event_list = []
-            
-            for calendar in calendars:
-                try:
-                    # Search for events
-                    events = calendar.search(
-                        start=start_of_today,
-                        end=end_date,
-                        event=True,
-                        expand=True
-                    )
-                except Exception:
-                    continue
-                
-                for event in events:
-                    try:
-                        event_data = self._parse_event_ical(event)
-                        if event_data and event_data['start']:
-                            event_list.append(event_data)
-                    except Exception:
-                        continue
+            # Query whole days so the window (and its CTag cache entry) stays
+            # the same for the entire day, then trim to the exact range
+            window_end = start_of_today + timedelta(days=days_ahead + 1)
+            event_list = [
+                e for e in self._search_events(start_of_today, window_end, f'upcoming_{days_ahead}')
+                if e.start and e.start < end_date
+            ]
             
             # Sort by start time
-            event_list.sort(key=lambda x: x['start'])
+            event_list.sort(key=attrgetter('start'))
             
-            return event_list
+            self._events_cache[days_ahead] = (time.monotonic() + self.EVENTS_CACHE_TTL, event_list)
+            return list(event_list)
             
         except Exception as e:
-            print(f"Error fetching calendar events: {e}")
+            logger.error("Error fetching calendar events: %s", e)
+            # The cached session may have gone stale (e.g. changed password)
+            self._invalidate_client_cache()
+            if raise_errors:
+                raise
             return []
-    
-    def _parse_event_ical(self, event) -> Dict[str, Any] | None:
-        """Parse a calendar event using the icalendar library (caldav 2.0+)"""
-        ical = event.icalendar_instance
-        if ical is None:
-            return None
+
+    def _search_events(self, start: datetime, end: datetime, cache_name: str) -> List[Event]:
+        """Get the events in [start, end) from every calendar.
+
+        Each calendar's result is kept on disk together with its CTag. As long
+        as a cheap PROPFIND returns the same CTag (nothing in the calendar
+        changed) the cached events are used instead of querying them again,
+        and they are also served if the query itself fails.
+        """
+        calendars = self._get_calendars()
+        if len(calendars) == 1:
+            return self._search_calendar_events(calendars[0], start, end, cache_name)
         
-        for component in ical.walk():
-            if component.name != "VEVENT":
-                continue
-            
-            title = str(component.get("SUMMARY", "No Title"))
-            
-            # Handle start time
-            dtstart_prop = component.get("DTSTART")
-            start_time = self._parse_ical_dt(dtstart_prop) if dtstart_prop else None
-            
-            # Handle end time
-            dtend_prop = component.get("DTEND")
-            end_time = self._parse_ical_dt(dtend_prop) if dtend_prop else None
-            
-            # Handle location
-            location = component.get("LOCATION")
-            location = str(location) if location else None
-            
-            # Handle description
-            description = component.get("DESCRIPTION")
-            description = str(description) if description else None
-            
-            # All-day check
-            all_day = isinstance(dtstart_prop.dt, date) and not isinstance(dtstart_prop.dt, datetime) if dtstart_prop else False
-            
-            event_id = str(component.get("UID", "unknown"))
-            
-            return {
-                'id': event_id,
-                'title': title,
-                'start': start_time,
-                'end': end_time,
-                'location': location,
-                'description': description,
-                'all_day': all_day
-            }
+        # The per-calendar PROPFIND/REPORT round-trips are independent, so
+        # run them side by side on the pooled session
+        event_list = []
+        for events in _calendar_executor.map(
+                lambda calendar: self._search_calendar_events(calendar, start, end, cache_name), calendars):
+            event_list.extend(events)
+        return event_list
+
+    def _search_calendar_events(self, calendar, start: datetime, end: datetime, cache_name: str) -> List[Event]:
+        """Get the events in [start, end) from one calendar (see _search_events)"""
+        url = str(calendar.url)
+        cache_key = f"calendar_events:{hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}:{cache_name}"
+        window = [start.isoformat(), end.isoformat()]
+        
+        cached = self.cache_service.get(cache_key)
+        if cached and cached.get('window') != window:
+            cached = None
+        
+        ctag = self._get_ctag(calendar)
+        if cached and ctag and cached.get('ctag') == ctag:
+            return _deserialize_events(cached['events'])
+        
+        try:
+            events = self._fetch_calendar_events(calendar, start, end)
+        except Exception as e:
+            if cached:
+                logger.warning("Calendar fetch failed, serving cached events: %s", e)
+                return _deserialize_events(cached['events'])
+            return []
         
+        self.cache_service.set(cache_key, {
+            'ctag': ctag,
+            'window': window,
+            'events': _serialize_events(events),
+        }, ttl=self.EVENTS_DISK_CACHE_TTL)
+        return events
+
+    def _get_ctag(self, calendar) -> str | None:
+        """Get the calendar's CTag, which changes whenever any event in it changes"""
+        try:
+            response = calendar.client.propfind(str(calendar.url), _CTAG_QUERY, depth=0)
+            if response.status >= 400 or response.tree is None:
+                return None
+            for element in response.tree.iter(_CTAG_TAG):
+                if element.text:
+                    return element.text.strip()
+        except Exception as e:
+            logger.warning("Could not read calendar CTag: %s", e)
         return None
+
+    def _fetch_calendar_events(self, calendar, start: datetime, end: datetime) -> List[Event]:
+        """Query one calendar, falling back to caldav's search if the REPORT is rejected"""
+        try:
+            return self._query_events(calendar, start, end)
+        except Exception as e:
+            logger.warning("Calendar query failed, falling back to a full search: %s", e)
+        
+        # expand=True lets the server unroll recurring events, so we only
+        # ever parse the instances inside the window
+        events = calendar.search(start=start, end=end, event=True, expand=True)
+        
+        parse = self._parse_event_ical
+        event_list = []
+        for event in events:
+            try:
+                event_data = parse(event)
+                if event_data:
+                    event_list.append(event_data)
+            except Exception as e:
+                logger.debug("Skipping unparsable event %s: %s", getattr(event, 'url', '?'), e)
+                continue
+        return event_list
+
+    def _query_events(self, calendar, start: datetime, end: datetime) -> List[Event]:
+        """Expanded calendar-query REPORT that only asks for the VEVENT properties we use"""
+        start_utc = start.astimezone(_UTC).strftime('%Y%m%dT%H%M%SZ')
+        end_utc = end.astimezone(_UTC).strftime('%Y%m%dT%H%M%SZ')
+        body = _EVENT_QUERY.format(start=start_utc, end=end_utc)
+        
+        response = calendar.client.report(str(calendar.url), body, depth=1)
+        if response.status >= 400 or response.tree is None:
+            raise Exception(f"REPORT failed with status {response.status}")
+        
+        event_list = []
+        for calendar_data in response.tree.iter(_CALENDAR_DATA_TAG):
+            if not calendar_data.text:
+                continue
+            try:
+                ical = Calendar.from_ical(calendar_data.text)
+            except ValueError:
+                continue
+            # An expanded recurring event comes back as one resource with a
+            # VEVENT per occurrence
+            for component in ical.walk("VEVENT"):
+                event_list.append(_parse_vevent(component))
+        logger.debug("Calendar query returned %d events for %s", len(event_list), calendar.url)
+        return event_list
     
-    def _parse_ical_dt(self, prop) -> datetime | None:
-        """Parse a datetime/date from an icalendar property"""
-        if prop is None:
+    def _parse_event_ical(self, event) -> Event | None:
+        """Parse a calendar event's raw iCalendar data using the icalendar library"""
+        # Parse event.data directly instead of going through caldav's
+        # icalendar_instance, which keeps data/vobject/icalendar copies in sync
+        data = event.data
+        if not data:
             return None
-        dt = prop.dt if hasattr(prop, 'dt') else prop
-        if isinstance(dt, datetime):
-            if dt.tzinfo is None:
-                dt = pytz.UTC.localize(dt)
-            return dt
-        elif isinstance(dt, date):
-            # Convert date to datetime at midnight UTC
-            return datetime(dt.year, dt.month, dt.day, tzinfo=pytz.UTC)
+        ical = Calendar.from_ical(data)
+        
+        for component in ical.walk("VEVENT"):
+            return _parse_vevent(component)
+        
         return None
     
-    def get_today_events(self) -> List[Dict[str, Any]]:
+    def get_today_events(self) -> List[Event]:
         """Get today's events for AI image generation prompt"""
+        cached = self._events_cache.get('today')
+        if cached and cached[0] > time.monotonic():
+            return list(cached[1])
+        
         try:
-            calendars = self._get_calendars()
-            
             # Get today's events
-            now = datetime.now(pytz.UTC)
+            now = datetime.now(_UTC)
             start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
             end_of_day = start_of_day + timedelta(days=1)
             
-            event_list = []
-            
-            for calendar in calendars:
-                try:
-                    events = calendar.search(
-                        start=start_of_day,
-                        end=end_of_day,
-                        event=True,
-                        expand=True
-                    )
-                except Exception:
-                    continue
-                
-                for event in events:
-                    try:
-                        event_data = self._parse_event_ical(event)
-                        if event_data:
-                            event_list.append(event_data)
-                    except Exception:
-                        continue
+            # A refresh of both displays asks for the upcoming days (B&W) and
+            # for today (color); a fresh upcoming window already covers today
+            upcoming = next(
+                (events for key, (expires, events) in list(self._events_cache.items())
+                 if key != 'today' and key >= 1 and expires > time.monotonic()),
+                None
+            )
+            if upcoming is not None:
+                event_list = [
+                    e for e in upcoming
+                    if e.start < end_of_day and (e.end or e.start) >= start_of_day
+                ]
+            else:
+                event_list = self._search_events(start_of_day, end_of_day, 'today')
             
             # Sort by start time
-            event_list.sort(key=lambda x: x['start'] if x['start'] else datetime.min.replace(tzinfo=pytz.UTC))
+            event_list.sort(key=lambda x: x.start or _MIN_START)
             
-            return event_list
+            self._events_cache['today'] = (time.monotonic() + self.EVENTS_CACHE_TTL, event_list)
+            return list(event_list)
             
         except Exception as e:
-            print(f"Error fetching today's events: {e}")
+            logger.error("Error fetching today's events: %s", e)
+            self._invalidate_client_cache()
             return []
-
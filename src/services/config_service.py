@@ -2,18 +2,16 @@ import json
 import os
 from typing import Dict, Any
 
-class ConfigService:
-    def __init__(self):
-        self.config_file = 'config.json'
-        self.default_config = {
-            'apple_id': '',
-            'app_password': '',
-            'calendar_url': '',
-            'weather_location': 'Berlin',
-            'openweather_api_key': os.getenv('OPENWEATHER_API_KEY', ''),
-            'gemini_api_key': os.getenv('GEMINI_API_KEY', ''),
-            'color_display_refresh_time': '06:00',
-            'ai_prompt_template': '''I want you to write a detailed prompt for an AI to generate a modern painting that is being shown on an 7.3" e-ink display that supports 6 colors (black, white, red, green, blue, yellow) with a aspect ratio of 5:3. The generated image should reflect today.
+# orjson is optional; fall back to the stdlib json module
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj, indent=2).encode('utf-8')
+
+DEFAULT_AI_PROMPT_TEMPLATE = '''I want you to write a detailed prompt for an AI to generate a modern painting that is being shown on an 7.3" e-ink display that supports 6 colors (black, white, red, green, blue, yellow) with a aspect ratio of 5:3. The generated image should reflect today.
 
 *Todays information*
 Date: {today_date}
@@ -27,31 +25,84 @@ Be creative by choosing a style, but NEVER choose abstract design.
 Always generate a single picture and never split it into multiple images. Try to combine every occassion that the calendar, the weather and the date has to offer into a single image.
 
 Let it only generate an image without any text that is drawn onto the image like title, date or something like that.'''
+
+DEFAULT_CONFIG = {
+    'apple_id': '',
+    'app_password': '',
+    'calendar_url': '',
+    'weather_location': 'Berlin',
+    'openweather_api_key': '',
+    'gemini_api_key': '',
+    'color_display_refresh_time': '06:00',
+    'calendar_cache_ttl': 120,  # seconds, /api/calendar/events
+    'ai_prompt_template': DEFAULT_AI_PROMPT_TEMPLATE,
+    'ai_single_step_generation': False,  # let the image model write its own prompt
+}
+
+class ConfigService:
+    def __init__(self):
+        self.config_file = 'config.json'
+        # Parsed config.json and the (mtime, size) it was read at
+        self._cached_config = None
+        self._cached_signature = None
+        self.default_config = {
+            **DEFAULT_CONFIG,
+            # Read when the service is created, so values loaded from .env apply
+            'openweather_api_key': os.getenv('OPENWEATHER_API_KEY', ''),
+            'gemini_api_key': os.getenv('GEMINI_API_KEY', ''),
         }
     
+    def _load_config(self) -> Dict[str, Any]:
+        """Get the merged configuration, re-reading config.json only when it changed"""
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return self.default_config
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._cached_signature:
+            return self._cached_config
+        
+        try:
+            with open(self.config_file, 'rb') as f:
+                config = _json_loads(f.read())
+            # Merge with defaults to ensure all keys exist
+            merged_config = self.default_config.copy()
+            merged_config.update(config)
+        except (ValueError, IOError):
+            return self.default_config
+        
+        self._cached_config = merged_config
+        self._cached_signature = signature
+        return merged_config
+    
     def get_config(self) -> Dict[str, Any]:
         """Get current configuration"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                # Merge with defaults to ensure all keys exist
-                merged_config = self.default_config.copy()
-                merged_config.update(config)
-                return merged_config
-            except (json.JSONDecodeError, IOError):
-                return self.default_config.copy()
-        return self.default_config.copy()
+        # Hand out a copy so callers can't modify the cached config
+        return self._load_config().copy()
     
     def update_config(self, new_config: Dict[str, Any]) -> None:
         """Update configuration"""
         current_config = self.get_config()
         current_config.update(new_config)
         
-        with open(self.config_file, 'w') as f:
-            json.dump(current_config, f, indent=2)
+        # Write to a temporary file and swap it in, so a crash or power cut
+        # mid-write can never leave a truncated config.json behind
+        tmp_file = self.config_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(_json_dumps(current_config))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.config_file)
+        
+        # Force a re-read, the mtime may not have ticked on coarse filesystems
+        self._cached_signature = None
     
     def get(self, key: str, default=None):
         """Get a specific config value"""
-        config = self.get_config()
-        return config.get(key, default)
\ No newline at end of file
+        config = self._load_config()
+        return config.get(key, default)
+
+
+# Shared instance so every service benefits from the same parsed-config cache
+config_service = ConfigService()
@@ -1,35 +1,228 @@
 import os
 import sys
-from PIL import Image
+import importlib.util
+from PIL import Image, ImageOps
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from io import BytesIO
 import json
-from google import genai
-from google.genai import types
-import struct
+import logging
+import threading
 import time
 import random
 import re
-import pytz
 import hashlib
-import httpx
-from src.services.config_service import ConfigService
+from src.models.event import Event
+from src.services.config_service import config_service
 from src.services.weather_service import WeatherService
 from src.services.calendar_service import CalendarService
+from src.services.cache_service import CacheService
 from src.services.weather_translations import translate_weather_description, translate_ui_text
 
-# Add the waveshare library path from git submodule
-waveshare_lib_path = os.path.join(os.path.dirname(__file__), '../../waveshare-epaper/RaspberryPi_JetsonNano/python/lib')
-sys.path.append(waveshare_lib_path)
+# Waveshare library from the git submodule, only put on sys.path when the
+# display is first loaded and waveshare_epd isn't installed as a package
+WAVESHARE_LIB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../waveshare-epaper/RaspberryPi_JetsonNano/python/lib'))
+
+logger = logging.getLogger(__name__)
 
 # Check if we should force mock mode (useful for development)
 FORCE_MOCK_DISPLAY = os.getenv('FORCE_MOCK_DISPLAY', 'false').lower() == 'true'
 
+# Program a faster PLL frame rate after init to roughly halve the color
+# panel's refresh time. Off by default, it runs outside the driver's stock timing.
+COLOR_FAST_REFRESH = os.getenv('COLOR_FAST_REFRESH', 'false').lower() == 'true'
+
+# Run the color panel's SPI frame push as a SCHED_FIFO thread pinned to the
+# last CPU core to reduce scheduling jitter (needs CAP_SYS_NICE)
+SPI_REALTIME = os.getenv('SPI_REALTIME', 'false').lower() == 'true'
+
+# Generated color images are cached here for the rest of the day
+IMAGE_CACHE_DIR = 'image_cache'
+
+# Set to 'true' to also write each generated image to debug_generated_image.png
+DEBUG_SAVE_IMAGES = os.getenv('DEBUG_SAVE_IMAGES', 'false').lower() == 'true'
+
+# Dithering implementation: 'pillow' (C quantizer, default), 'numba' (JIT
+# compiled error diffusion, falls back to numpy if numba is missing) or
+# 'numpy' (reference)
+DITHER_BACKEND = os.getenv('DITHER_BACKEND', 'pillow').lower()
+
+# Try to import numba for the JIT dithering backend. Importing it takes
+# seconds on a Pi Zero, so only do that when the backend is selected
+NUMBA_AVAILABLE = False
+if DITHER_BACKEND == 'numba':
+    try:
+        from numba import njit
+        NUMBA_AVAILABLE = True
+    except ImportError:
+        pass
+
+# Colors supported by the 7.3" color e-ink display, in the panel's own 4-bit
+# color index order. Index 4 is unused by the controller; it aliases black so
+# the quantizer (which picks the first closest entry) never selects it.
+EINK_PALETTE = (
+    (0, 0, 0),        # 0 Black
+    (255, 255, 255),  # 1 White
+    (255, 255, 0),    # 2 Yellow
+    (255, 0, 0),      # 3 Red
+    (0, 0, 0),        # 4 (unused)
+    (0, 0, 255),      # 5 Blue
+    (0, 255, 0),      # 6 Green
+)
+
+@lru_cache(maxsize=None)
+def _get_palette_image() -> Image.Image:
+    """Get the 'P'-mode image Pillow's quantizer uses as the target palette (built once)"""
+    palette_image = Image.new('P', (1, 1))
+    flat_palette = [channel for color in EINK_PALETTE for channel in color]
+    palette_image.putpalette(flat_palette + [0, 0, 0] * (256 - len(EINK_PALETTE)))
+    return palette_image
+
+@lru_cache(maxsize=None)
+def _get_palette_array() -> np.ndarray:
+    """Get the distinct palette colors as a float32 (N, 3) array (built once)"""
+    return np.array(list(dict.fromkeys(EINK_PALETTE)), dtype=np.float32)
+
+@lru_cache(maxsize=None)
+def _get_palette_indices() -> np.ndarray:
+    """Get the panel color index of each entry of _get_palette_array() (built once)"""
+    return np.array([EINK_PALETTE.index(color) for color in dict.fromkeys(EINK_PALETTE)], dtype=np.uint8)
+
+@lru_cache(maxsize=None)
+def _get_palette_lut() -> np.ndarray:
+    """Get the closest palette index for every 5-bit-per-channel RGB value (built once).
+
+    A (32, 32, 32) uint8 table is 32 KB and fits the Pi's L1 data cache; a
+    full 8-bit table would be 16 MB. With only six far apart colors the
+    coarser bins hardly ever change the pick.
+    """
+    palette = _get_palette_array()
+    levels = np.arange(32, dtype=np.float32) * 8 + 3.5  # center of each bin
+    r, g, b = levels[:, None, None], levels[None, :, None], levels[None, None, :]
+    lut = np.zeros((32, 32, 32), dtype=np.uint8)
+    best_dist = np.full((32, 32, 32), np.inf, dtype=np.float32)
+    for i, (pr, pg, pb) in enumerate(palette):
+        dist = (r - pr) ** 2 + (g - pg) ** 2 + (b - pb) ** 2
+        closer = dist < best_dist
+        best_dist[closer] = dist[closer]
+        lut[closer] = i
+    return lut
+
+def _clamp(value):
+    """Clamp a diffused channel value to 0..255"""
+    return min(max(value, 0), 255)
+
+def _diffuse(row, i, error_r, error_g, error_b, weight):
+    """Add weight sixteenths of a pixel's quantization error to row[i]"""
+    row[i, 0] += error_r * weight
+    row[i, 1] += error_g * weight
+    row[i, 2] += error_b * weight
+
+def _floyd_steinberg_kernel(src, palette, lut, panel_indices, out):
+    """Floyd-Steinberg error diffusion of a uint8 (H, W, 3) array into a
+    uint8 (H, W) array of panel color indices.
+
+    The diffused error is kept in two rolling rows (the current and the
+    next one) instead of a float copy of the whole frame, so the working set
+    stays in cache. Each row has one pixel of padding on both sides, which
+    takes the error that would fall off the edge without bounds checks.
+    The rows are int16 and hold the error in sixteenths, so the 7/3/5/1
+    weights are plain integer multiplies and the rows take half the space
+    of float32. Diffused values are clamped to 0..255 before the error is
+    taken, which bounds each error to +-255 and a cell to 16 * 255.
+    
+    Rows are scanned in alternating directions (serpentine), with the
+    diffusion offsets mirrored on right-to-left rows, so the error does not
+    always drift the same way and leave diagonal streaks.
+    """
+    height, width = src.shape[0], src.shape[1]
+    errors = np.zeros((2, width + 2, 3), dtype=np.int16)
+    for y in range(height):
+        current = errors[y % 2]
+        below = errors[(y + 1) % 2]
+        below[:] = 0
+        if y % 2 == 0:
+            x_start, x_end, step = 0, width, 1
+        else:
+            x_start, x_end, step = width - 1, -1, -1
+        for x in range(x_start, x_end, step):
+            i = x + 1  # position in the padded error rows
+            r = _clamp(int(src[y, x, 0]) + current[i, 0] // 16)
+            g = _clamp(int(src[y, x, 1]) + current[i, 1] // 16)
+            b = _clamp(int(src[y, x, 2]) + current[i, 2] // 16)
+            
+            # Closest palette color from the precomputed table
+            best = lut[r >> 3, g >> 3, b >> 3]
+            
+            out[y, x] = panel_indices[best]
+            error_r = r - int(palette[best, 0])
+            error_g = g - int(palette[best, 1])
+            error_b = b - int(palette[best, 2])
+            _diffuse(current, i + step, error_r, error_g, error_b, 7)
+            _diffuse(below, i - step, error_r, error_g, error_b, 3)
+            _diffuse(below, i, error_r, error_g, error_b, 5)
+            _diffuse(below, i + step, error_r, error_g, error_b, 1)
+
+if NUMBA_AVAILABLE:
+    # Compiled lazily on first use; cache=True keeps the machine code on disk
+    # so only the very first run after an install pays the compile time
+    _clamp = njit(cache=True, inline='always')(_clamp)
+    _diffuse = njit(cache=True, inline='always')(_diffuse)
+    _floyd_steinberg_kernel = njit(cache=True, fastmath=True)(_floyd_steinberg_kernel)
+
+@contextmanager
+def _spi_realtime_priority():
+    """Temporarily pin the calling thread to one core with SCHED_FIFO priority"""
+    if not SPI_REALTIME or not hasattr(os, 'sched_setscheduler'):
+        yield
+        return
+    
+    # pid 0 refers to the calling thread on Linux
+    previous_affinity = os.sched_getaffinity(0)
+    previous_policy = os.sched_getscheduler(0)
+    previous_param = os.sched_getparam(0)
+    try:
+        os.sched_setaffinity(0, {(os.cpu_count() or 1) - 1})
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(50))
+    except OSError as e:
+        print(f"⚠ Could not raise SPI thread priority (CAP_SYS_NICE missing?): {e}")
+    try:
+        yield
+    finally:
+        try:
+            os.sched_setscheduler(0, previous_policy, previous_param)
+            os.sched_setaffinity(0, previous_affinity)
+        except OSError as e:
+            print(f"⚠ Could not restore thread scheduling: {e}")
+
+# Runs the independent weather/calendar fetches of a refresh concurrently
+# (three for the B&W display, two for the color display)
+_fetch_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix='fetch')
+
+# Drives the color (SPI) and B&W (I2C) panels side by side on a full refresh
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='refresh')
+
+# Transliterations for characters the ESP32's ASCII fonts can't draw
+_DISPLAY_CHAR_MAP = str.maketrans({
+    'ä': 'ae', 'ö': 'oe', 'ü': 'ue',
+    'Ä': 'Ae', 'Ö': 'Oe', 'Ü': 'Ue',
+    'ß': 'ss',
+    'é': 'e', 'è': 'e', 'ê': 'e',
+    'á': 'a', 'à': 'a', 'â': 'a',
+    'í': 'i', 'ì': 'i', 'î': 'i',
+    'ó': 'o', 'ò': 'o', 'ô': 'o',
+    'ú': 'u', 'ù': 'u', 'û': 'u',
+    'ç': 'c', 'ñ': 'n',
+})
+
 # I2C configuration
 ESP32_I2C_ADDRESS = 0x42
 I2C_BUS = 1  # RPi I2C bus number
+I2C_CHUNK_SIZE = 2048  # ESP32 Wire receive buffer size (see Wire.setBufferSize in the sketch)
 
 # Try to import I2C libraries
 try:
@@ -59,6 +252,8 @@ def _load_epd7in3e():
             from src.services import epdconfig_rpi_gpio
             
             # Import the waveshare module
+            if importlib.util.find_spec('waveshare_epd') is None and WAVESHARE_LIB_PATH not in sys.path:
+                sys.path.append(WAVESHARE_LIB_PATH)
             from waveshare_epd import epd7in3e as _epd7in3e
             
             # Monkey patch the epdconfig to use our RPi.GPIO implementation
@@ -66,7 +261,7 @@ def _load_epd7in3e():
             
             epd7in3e = _epd7in3e
             print("Successfully imported epd7in3e module with RPi.GPIO patch")
-            print(f"Patched epdconfig module: {epd7in3e.epdconfig.__name__}")
+            logger.debug("Patched epdconfig module: %s", epd7in3e.epdconfig.__name__)
         except ImportError as e:
             print(f"Warning: Waveshare e-paper library not available: {e}")
             print("Display functions will be mocked.")
@@ -82,10 +277,28 @@ def _load_epd7in3e():
     return epd7in3e
 
 class DisplayService:
+    # There is only one color panel and one ESP32 on the bus, so every caller
+    # (API routes, scheduler) shares a single instance and its cached data.
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
     def __init__(self):
-        self.config_service = ConfigService()
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self._initialized = True
+
+        self.config_service = config_service
         self.weather_service = WeatherService()
         self.calendar_service = CalendarService()
+        self.cache_service = CacheService()
         
         # Display dimensions
         self.COLOR_WIDTH = 800
@@ -97,17 +310,46 @@ class DisplayService:
         self.color_epd = None
         self.display_initialized = False
         
+        # Serialize refreshes per display so overlapping manual and scheduled
+        # refreshes never drive the SPI/I2C hardware at the same time
+        self._color_lock = threading.Lock()
+        self._bw_lock = threading.Lock()
+        
         # I2C communication
         self.i2c_bus = None
         self.i2c_initialized = False
         
-        # Data caching for B&W display
+        # Data caching for B&W display (persisted in cache_service so other
+        # processes and restarts reuse it instead of hitting the APIs again)
         self.cached_weather_data = None
         self.cached_calendar_data = None
-        self.last_api_fetch = 0
         self.last_i2c_send = 0
-        self.API_CACHE_DURATION = 1800  # 30 minutes in seconds
+        # Clearly below the 30 minute B&W schedule: an entry is written when
+        # its fetch finishes, so a TTL of a full period would still be valid
+        # at the next run and the data would only update every other run
+        self.API_CACHE_DURATION = 1500  # 25 minutes in seconds
         self.I2C_SEND_INTERVAL = 30     # 30 seconds
+        self.I2C_KEEPALIVE_INTERVAL = 3600  # resend unchanged data after 1 hour
+        
+        # Content hash and time of the last complete transmission to the ESP32
+        self._last_i2c_hash = None
+        self._last_i2c_transmit = 0.0
+        
+        # Hash of the last frame pushed to each display (see _frame_hash)
+        self._last_frame_hash = {}
+        
+        # Last refresh time per display, mirrored from last_refresh_*.txt
+        self._last_refresh = {}
+        
+        # Whether the color panel has been cleared since startup
+        self._color_cleared = False
+        
+        # Image cache entry of the latest generated color image
+        self._output_image_path = None
+        
+        # Gemini client, created on first image generation
+        self._genai_client = None
+        self._genai_client_key = None
         
         # Don't load the display module during init - wait until actually needed
         print("Display service initialized (hardware will be loaded on first use)")
@@ -180,71 +422,171 @@ class DisplayService:
         """
         if display_type != 'color':
             return None
-        path = os.path.abspath('debug_generated_image.png')
-        return path if os.path.exists(path) else None
+        path = self._output_image_path
+        if not path or not os.path.exists(path):
+            # Not generated since the last restart: the newest cached image
+            # is the one on the panel
+            path = self._latest_cached_image_path()
+        return os.path.abspath(path) if path else None
 
     def _get_last_refresh_time(self, display_type: str) -> str:
-        """Get last refresh time from file"""
+        """Get last refresh time (read from file once, then kept in memory)"""
+        if display_type in self._last_refresh:
+            return self._last_refresh[display_type]
         filename = f"last_refresh_{display_type}.txt"
+        last_refresh = "Never"
         try:
             if os.path.exists(filename):
                 with open(filename, 'r') as f:
-                    return f.read().strip()
+                    last_refresh = f.read().strip()
         except:
             pass
-        return "Never"
+        self._last_refresh[display_type] = last_refresh
+        return last_refresh
     
     def _set_last_refresh_time(self, display_type: str):
-        """Set last refresh time to file"""
-        filename = f"last_refresh_{display_type}.txt"
+        """Set last refresh time, writing the file at most once per minute"""
+        previous = self._get_last_refresh_time(display_type)
+        now = datetime.now().isoformat()
+        self._last_refresh[display_type] = now
+        # ISO timestamps share a prefix up to the minute ("YYYY-MM-DDTHH:MM")
+        if previous[:16] != now[:16]:
+            self._write_state_file(f"last_refresh_{display_type}.txt", now)
+    
+    def _write_state_file(self, filename: str, content: str):
+        """Replace a small state file atomically (never leaves it half-written)"""
+        tmp_filename = filename + '.tmp'
+        try:
+            with open(tmp_filename, 'w') as f:
+                f.write(content)
+            os.replace(tmp_filename, filename)
+        except:
+            pass
+    
+    def _apply_refresh_tuning(self):
+        """Raise the panel's frame rate (PLL register) to shorten the refresh"""
+        if not COLOR_FAST_REFRESH:
+            return
+        try:
+            # PLL control: FRS=0x07 roughly halves the Spectra 6 refresh
+            # time compared to the driver's default
+            self.color_epd.send_command(0x30)
+            self.color_epd.send_data(0x07)
+            print("✓ Fast refresh PLL setting applied")
+        except Exception as e:
+            print(f"⚠ Could not apply fast refresh PLL setting: {e}")
+    
+    def _get_color_buffer(self, image: Image.Image) -> bytes:
+        """Pack an image into the panel's 4-bit-per-pixel framebuffer.
+
+        Does the same as the driver's getbuffer(), but maps the pixels to
+        palette indices in Pillow's C quantizer and packs the nibble pairs
+        with numpy instead of a Python loop over all 384,000 pixels.
+        """
+        if image.size != (self.COLOR_WIDTH, self.COLOR_HEIGHT):
+            # Let the driver deal with rotation/odd sizes
+            return self.color_epd.getbuffer(image)
+        
+        palette_size = 3 * len(EINK_PALETTE)
+        if image.mode == 'P' and image.getpalette()[:palette_size] == _get_palette_image().getpalette()[:palette_size]:
+            # Dithered by Pillow against our palette: the pixel values already
+            # are the panel's color indices
+            indexed = image
+        else:
+            # The image is already dithered to the palette, so plain nearest
+            # color mapping yields the panel's color indices directly
+            # (convert() would copy an image that is already RGB, so skip it)
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            indexed = image.quantize(palette=_get_palette_image(), dither=Image.Dither.NONE)
+        pixels = np.frombuffer(indexed.tobytes(), dtype=np.uint8).reshape(-1, 2)
+        packed = pixels[:, 0] << 4
+        packed |= pixels[:, 1]
+        return packed.tobytes()
+    
+    def _frame_hash(self, buffer) -> str:
+        """Hash a packed display buffer for change detection"""
+        # The driver's getbuffer() (odd image sizes) returns a list
+        return hashlib.blake2b(bytes(buffer), digest_size=16).hexdigest()
+    
+    def _get_last_frame_hash(self, display_type: str) -> Optional[str]:
+        """Get the hash of the frame last pushed to the display"""
+        if display_type in self._last_frame_hash:
+            return self._last_frame_hash[display_type]
+        filename = f"last_{display_type}_buffer.hash"
+        frame_hash = None
         try:
-            with open(filename, 'w') as f:
-                f.write(datetime.now().isoformat())
+            if os.path.exists(filename):
+                with open(filename, 'r') as f:
+                    frame_hash = f.read().strip() or None
         except:
             pass
+        self._last_frame_hash[display_type] = frame_hash
+        return frame_hash
+    
+    def _set_last_frame_hash(self, display_type: str, frame_hash: str):
+        """Remember the hash of the frame just pushed, across restarts"""
+        self._last_frame_hash[display_type] = frame_hash
+        self._write_state_file(f"last_{display_type}_buffer.hash", frame_hash)
     
-    def refresh_display(self, display_type: str = 'both') -> Dict[str, Any]:
-        """Refresh display(s)"""
+    def refresh_display(self, display_type: str = 'both', use_cache: bool = True, force_clear: bool = False) -> Dict[str, Any]:
+        """Refresh display(s). With use_cache=False a new color image is always generated,
+        with force_clear=True the color panel is cleared before the new image is shown."""
         result = {'success': True, 'messages': []}
         
-        if display_type in ['color', 'both']:
-            try:
-                self.update_color_display()
-                result['messages'].append('Color display refreshed successfully')
-            except Exception as e:
-                result['success'] = False
-                result['messages'].append(f'Color display refresh failed: {str(e)}')
+        if not use_cache:
+            self.weather_service.clear_cache()
         
+        # The two panels sit on separate buses with separate locks, so on a
+        # full refresh the slow color update no longer holds up the B&W one
+        futures = []
+        if display_type in ['color', 'both']:
+            futures.append(('Color', _refresh_executor.submit(self.update_color_display, use_cache=use_cache, force_clear=force_clear)))
         if display_type in ['bw', 'both']:
+            futures.append(('B&W', _refresh_executor.submit(self.update_bw_display, force=not use_cache)))
+        
+        for name, future in futures:
             try:
-                self.update_bw_display()
-                result['messages'].append('B&W display refreshed successfully')
+                future.result()
+                result['messages'].append(f'{name} display refreshed successfully')
             except Exception as e:
                 result['success'] = False
-                result['messages'].append(f'B&W display refresh failed: {str(e)}')
+                result['messages'].append(f'{name} display refresh failed: {str(e)}')
         
         return result
     
-    def update_color_display(self):
-        """Update the color e-ink display with AI-generated image"""
+    def update_color_display(self, use_cache: bool = True, force_clear: bool = False):
+        """Update the color e-ink display with AI-generated image.
+        The panel is cleared first only on the first update or with force_clear=True."""
+        with self._color_lock:
+            self._update_color_display(use_cache, force_clear)
+    
+    def _update_color_display(self, use_cache: bool, force_clear: bool = False):
         try:
             print("=== Starting color display update ===")
             
             # Generate AI image based on today's events and weather
             print("Generating AI image...")
-            image = self.generate_daily_image()
+            image = self.generate_daily_image(use_cache=use_cache)
             print(f"✓ Image generated: {image.size[0]}x{image.size[1]} pixels, mode: {image.mode}")
             
             # Rotate image by 180 degrees for display orientation
-            print("Rotating image 180 degrees...")
             image = image.rotate(180)
-            print(f"✓ Image rotated: {image.size[0]}x{image.size[1]} pixels, mode: {image.mode}")
+            logger.debug("Image rotated 180 degrees: %dx%d pixels, mode: %s", image.size[0], image.size[1], image.mode)
             
             # Ensure display is loaded before using it
             if not self.color_epd:
                 self._ensure_display_loaded()
             
-            if self.color_epd:
+            # A full refresh of the color panel takes ~20 seconds and wears it,
+            # so don't push a buffer that is identical to the one already shown
+            buffer = self._get_color_buffer(image) if self.color_epd else None
+            frame_hash = self._frame_hash(buffer) if buffer else None
+            frame_pushed = False
+            
+            if self.color_epd and frame_hash == self._get_last_frame_hash('color'):
+                print("✓ Frame unchanged since last refresh, skipping hardware update")
+            elif self.color_epd:
                 print("Hardware display detected, initializing...")
                 
                 # Get the epd module for cleanup operations
@@ -261,7 +603,7 @@ class DisplayService:
                             print(f"Warning during cleanup: {cleanup_error}")
                         
                     print("Initializing display hardware...")
-                    print(f"Using epdconfig: {epd_module.epdconfig.__name__}")
+                    logger.debug("Using epdconfig: %s", epd_module.epdconfig.__name__)
                     
                     # Try display initialization with retry logic
                     max_init_retries = 3
@@ -295,25 +637,30 @@ class DisplayService:
                     if not init_success:
                         raise Exception("Failed to initialize display after all retry attempts")
                     
-                    print("Clearing display...")
-                    self.color_epd.Clear()
-                    print("✓ Display cleared")
+                    self._apply_refresh_tuning()
+                    
+                    # display() does a full refresh on its own; the extra
+                    # clear cycle is only worth it against ghosting
+                    if force_clear or not self._color_cleared:
+                        print("Clearing display...")
+                        self.color_epd.Clear()
+                        self._color_cleared = True
+                        print("✓ Display cleared")
                     
                     # Display the image
-                    print("Converting image to display buffer...")
-                    buffer = self.color_epd.getbuffer(image)
-                    print(f"✓ Buffer created, size: {len(buffer) if buffer else 'None'} bytes")
+                    logger.debug("Display buffer created, size: %s bytes", len(buffer) if buffer else None)
                     
                     print("Sending image to display...")
-                    self.color_epd.display(buffer)
+                    with _spi_realtime_priority():
+                        self.color_epd.display(buffer)
                     print("✓ Image sent to display")
                     
                     # Put display to sleep to save power
-                    print("Putting display to sleep...")
                     self.color_epd.sleep()
-                    print("✓ Display in sleep mode")
+                    logger.debug("Display in sleep mode")
                     
                     print("✓ Color display updated successfully")
+                    frame_pushed = True
                     
                 except Exception as gpio_error:
                     print(f"✗ GPIO/Display error: {gpio_error}")
@@ -334,13 +681,15 @@ class DisplayService:
                             self.color_epd.init()
                             self.display_initialized = True
                             print("✓ Display recovery successful")
+                            self._apply_refresh_tuning()
                             
                             # Now try the display operation again
                             self.color_epd.Clear()
-                            buffer = self.color_epd.getbuffer(image)
-                            self.color_epd.display(buffer)
+                            with _spi_realtime_priority():
+                                self.color_epd.display(buffer)
                             self.color_epd.sleep()
                             print("✓ Color display updated successfully after recovery")
+                            frame_pushed = True
                         else:
                             raise Exception("Could not reinitialize display")
                         
@@ -348,44 +697,55 @@ class DisplayService:
                         print(f"✗ Display recovery failed: {recovery_error}")
                         # Save image as fallback
                         filename = 'color_display_output_gpio_error.png'
-                        image.save(filename)
+                        image.save(filename, compress_level=1)
                         print(f"✓ Image saved as {filename} due to GPIO error")
                         raise Exception(f"Display hardware error: {gpio_error}")
             else:
                 # Save image for testing
                 filename = 'color_display_output.png'
-                image.save(filename)
+                image.save(filename, compress_level=1)
                 print(f"✓ Color display mocked - image saved as {filename}")
                 print(f"  Image details: {image.size[0]}x{image.size[1]} pixels, {image.mode} mode")
             
+            if frame_pushed:
+                self._set_last_frame_hash('color', frame_hash)
+            
             self._set_last_refresh_time('color')
             print("✓ Last refresh time updated")
             print("=== Color display update completed ===")
             
         except Exception as e:
-            print(f"✗ Color display update failed: {str(e)}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
-            raise Exception(f"Color display update failed: {str(e)}")
+            # Logged by the caller (scheduler or API job); the traceback
+            # stays attached as the cause
+            raise Exception(f"Color display update failed: {str(e)}") from e
+    
+    def update_bw_display(self, force: bool = False):
+        """Update the B&W display via ESP32 with weather and calendar info.
+        With force=True the data is fetched from the APIs and sent even if
+        the ESP32 already has it."""
+        with self._bw_lock:
+            self._update_bw_display(force)
     
-    def update_bw_display(self):
-        """Update the B&W display via ESP32 with weather and calendar info"""
+    def _update_bw_display(self, force: bool = False):
         try:
             print("=== Starting B&W display update ===")
             
             # Check if we need to fetch fresh data from APIs (every 30 minutes)
             current_time = time.time()
-            if (current_time - self.last_api_fetch) >= self.API_CACHE_DURATION:
+            cached_weather = None if force else self.cache_service.get('bw_weather')
+            cached_calendar = None if force else self.cache_service.get('bw_calendar')
+            if cached_weather is None or cached_calendar is None:
                 print("Fetching fresh data from APIs...")
                 self._fetch_and_cache_data()
-                self.last_api_fetch = current_time
             else:
                 print("Using cached data (API cache still valid)")
+                self.cached_weather_data = cached_weather
+                self.cached_calendar_data = cached_calendar
             
             # Send data to ESP32 via I2C (every 30 seconds)
             if (current_time - self.last_i2c_send) >= self.I2C_SEND_INTERVAL:
                 print("Sending data to ESP32 via I2C...")
-                self._send_data_to_esp32()
+                self._send_data_to_esp32(force=force)
                 self.last_i2c_send = current_time
             else:
                 print("I2C send interval not reached yet")
@@ -399,105 +759,130 @@ class DisplayService:
     
     def _fetch_and_cache_data(self):
         """Fetch fresh weather and calendar data from APIs and cache it"""
+        # The upstream calls are independent, so run them side by side
+        print("Fetching weather details and calendar events...")
+        weather_future = _fetch_executor.submit(self.weather_service.get_enhanced_weather_for_display)
+        current_weather_future = _fetch_executor.submit(self.weather_service.get_current_weather)
+        events_future = _fetch_executor.submit(self.calendar_service.get_upcoming_events, days_ahead=3, raise_errors=True)
+        
+        # A failure of one source keeps the previously cached data of the other
         try:
-            # Fetch enhanced weather data (current temp, today min/max, tomorrow forecast)
-            print("Fetching enhanced weather data...")
-            weather = self.weather_service.get_enhanced_weather_for_display()
-            
-            # Also fetch current weather for additional data (humidity, wind, icon)
-            print("Fetching current weather details for modern display...")
-            current_weather = self.weather_service.get_current_weather()
-            
-            # Translate weather descriptions to German before caching
-            current_desc = weather.get('current_description', 'N/A')
-            today_desc = weather.get('today_description', 'N/A')
-            tomorrow_desc = weather.get('tomorrow_description', 'N/A') if weather.get('tomorrow_description') else None
-            
+            weather = weather_future.result()
+            current_weather = current_weather_future.result()
+            # WeatherService reports failures as placeholder data, don't let
+            # that replace the last good weather
+            error = weather.get('error') or current_weather.get('error')
+            if error:
+                logger.warning("✗ Weather unavailable, keeping the last weather data: %s", error)
+            elif weather.get('forecast_error') and self.cached_weather_data:
+                # Today's min/max would just be the current temperature
+                logger.warning("✗ Forecast unavailable, keeping the last weather data: %s", weather['forecast_error'])
+            else:
+                self._cache_weather_data(weather, current_weather)
+        except Exception as e:
+            logger.exception("✗ Error fetching weather data: %s", e)
+        
+        # Use fallback data if the API fails - with German translations
+        if not self.cached_weather_data:
             self.cached_weather_data = {
-                'current_temperature': weather.get('current_temperature', 0.0),
-                'current_description': translate_weather_description(current_desc)[:63],  # Translate and limit to 63 chars
-                'today_min': weather.get('today_min', 0.0),
-                'today_max': weather.get('today_max', 0.0),
-                'today_description': translate_weather_description(today_desc)[:63],  # Translate and limit
-                'tomorrow_min': weather.get('tomorrow_min'),
-                'tomorrow_max': weather.get('tomorrow_max'),
-                'tomorrow_description': translate_weather_description(tomorrow_desc)[:63] if tomorrow_desc else None,  # Translate if available
-                'location': weather.get('location', '')[:31],  # Limit to 31 chars
-                # Enhanced data for modern display (no icons)
-                'humidity': int(current_weather.get('humidity', 0)),
-                'wind_speed': float(current_weather.get('wind_speed', 0.0)),
+                'current_temperature': 0.0,
+                'current_description': translate_weather_description('Weather unavailable'),
+                'today_min': 0.0,
+                'today_max': 0.0,
+                'today_description': translate_weather_description('Data unavailable'),
+                'tomorrow_min': None,
+                'tomorrow_max': None,
+                'tomorrow_description': translate_weather_description('No forecast available'),
+                'location': '',
+                'humidity': 0,
+                'wind_speed': 0.0,
                 'timestamp': int(time.time())
             }
-            print(f"✓ Enhanced weather cached:")
-            print(f"  Current: {self.cached_weather_data['current_temperature']}°C, {self.cached_weather_data['current_description']}")
-            print(f"  Today: {self.cached_weather_data['today_min']}-{self.cached_weather_data['today_max']}°C, {self.cached_weather_data['today_description']}")
-            if self.cached_weather_data['tomorrow_min'] is not None:
-                print(f"  Tomorrow: {self.cached_weather_data['tomorrow_min']}-{self.cached_weather_data['tomorrow_max']}°C, {self.cached_weather_data['tomorrow_description']}")
-            print(f"  Modern data: Humidity={self.cached_weather_data.get('humidity', 0)}%, Wind={self.cached_weather_data.get('wind_speed', 0)}m/s")
-            
-            # Fetch calendar data
-            print("Fetching calendar events...")
-            events = self.calendar_service.get_upcoming_events(days_ahead=3)
-            
-            self.cached_calendar_data = []
-            
-            if events:
-                for i, event in enumerate(events[:6]):  # Limit to 6 events
-                    # Safely handle start time (keep as UTC timestamp - ESP32 will convert to local timezone)
-                    start_time = 0
-                    event_start = event.get('start') if event else None
-                    
-                    if event_start is not None and hasattr(event_start, 'timestamp'):
-                        try:
-                            start_time = int(event_start.timestamp())
-                        except (AttributeError, TypeError):
-                            start_time = 0
-                    
-                    # Safely handle other fields
-                    title = event.get('title', '') if event else ''
-                    location = event.get('location', '') if event else ''
-                    
-                    event_data = {
-                        'title': self._sanitize_text_for_display(title)[:63],  # Limit to 63 chars
-                        'location': self._sanitize_text_for_display(location)[:31] if location else '',  # Limit to 31 chars
-                        'start_time': start_time,
-                        'valid': bool(title),
-                        'all_day': bool(event.get('all_day', False)),
-                    }
-                    self.cached_calendar_data.append(event_data)
-            
-            print(f"✓ Calendar cached: {len(self.cached_calendar_data)} events")
-            
+        
+        try:
+            self._cache_calendar_data(events_future.result())
         except Exception as e:
-            print(f"✗ Error fetching API data: {e}")
-            import traceback
-            print(f"Full traceback: {traceback.format_exc()}")
-            
-            # Use fallback data if APIs fail - with German translations
-            if not self.cached_weather_data:
-                self.cached_weather_data = {
-                    'current_temperature': 0.0,
-                    'current_description': translate_weather_description('Weather unavailable'),
-                    'today_min': 0.0,
-                    'today_max': 0.0,
-                    'today_description': translate_weather_description('Data unavailable'),
-                    'tomorrow_min': None,
-                    'tomorrow_max': None,
-                    'tomorrow_description': translate_weather_description('No forecast available'),
-                    'location': '',
-                    'humidity': 0,
-                    'wind_speed': 0.0,
-                    'timestamp': int(time.time())
-                }
+            logger.exception("✗ Error fetching calendar data: %s", e)
             if not self.cached_calendar_data:
                 self.cached_calendar_data = []
     
-    def _send_data_to_esp32(self):
+    def _cache_weather_data(self, weather: Dict[str, Any], current_weather: Dict[str, Any]):
+        """Translate and cache the weather data for the B&W display"""
+        # Translate weather descriptions to German before caching
+        current_desc = weather.get('current_description', 'N/A')
+        today_desc = weather.get('today_description', 'N/A')
+        tomorrow_desc = weather.get('tomorrow_description', 'N/A') if weather.get('tomorrow_description') else None
+        
+        self.cached_weather_data = {
+            'current_temperature': weather.get('current_temperature', 0.0),
+            'current_description': translate_weather_description(current_desc)[:63],  # Translate and limit to 63 chars
+            'today_min': weather.get('today_min', 0.0),
+            'today_max': weather.get('today_max', 0.0),
+            'today_description': translate_weather_description(today_desc)[:63],  # Translate and limit
+            'tomorrow_min': weather.get('tomorrow_min'),
+            'tomorrow_max': weather.get('tomorrow_max'),
+            'tomorrow_description': translate_weather_description(tomorrow_desc)[:63] if tomorrow_desc else None,  # Translate if available
+            'location': weather.get('location', '')[:31],  # Limit to 31 chars
+            # Enhanced data for modern display (no icons)
+            'humidity': int(current_weather.get('humidity', 0)),
+            'wind_speed': float(current_weather.get('wind_speed', 0.0)),
+            'timestamp': int(time.time())
+        }
+        self.cache_service.set('bw_weather', self.cached_weather_data, ttl=self.API_CACHE_DURATION)
+        print(f"✓ Enhanced weather cached:")
+        print(f"  Current: {self.cached_weather_data['current_temperature']}°C, {self.cached_weather_data['current_description']}")
+        print(f"  Today: {self.cached_weather_data['today_min']}-{self.cached_weather_data['today_max']}°C, {self.cached_weather_data['today_description']}")
+        if self.cached_weather_data['tomorrow_min'] is not None:
+            print(f"  Tomorrow: {self.cached_weather_data['tomorrow_min']}-{self.cached_weather_data['tomorrow_max']}°C, {self.cached_weather_data['tomorrow_description']}")
+        print(f"  Modern data: Humidity={self.cached_weather_data.get('humidity', 0)}%, Wind={self.cached_weather_data.get('wind_speed', 0)}m/s")
+    
+    def _cache_calendar_data(self, events: List[Event]):
+        """Sanitize and cache the upcoming events for the B&W display"""
+        calendar_data = []
+        
+        if events:
+            for event in events[:6]:  # Limit to 6 events
+                if not event:
+                    continue
+                
+                # Keep start as UTC timestamp - ESP32 will convert to local timezone.
+                # Well-formed events always have a datetime here, so just try it
+                try:
+                    start_time = int(event.start.timestamp())
+                except (AttributeError, TypeError):
+                    start_time = 0
+                
+                title = event.title or ''
+                location = event.location or ''
+                
+                event_data = {
+                    'title': self._sanitize_text_for_display(title)[:63],  # Limit to 63 chars
+                    'location': self._sanitize_text_for_display(location)[:31] if location else '',  # Limit to 31 chars
+                    'start_time': start_time,
+                    'valid': bool(title),
+                    'all_day': event.all_day,
+                }
+                calendar_data.append(event_data)
+        
+        self.cached_calendar_data = calendar_data
+        self.cache_service.set('bw_calendar', self.cached_calendar_data, ttl=self.API_CACHE_DURATION)
+        print(f"✓ Calendar cached: {len(self.cached_calendar_data)} events")
+    
+    def _send_data_to_esp32(self, force: bool = False):
         """Send cached weather and calendar data to ESP32 via I2C"""
         if not self.cached_weather_data:
             print("✗ No cached weather data to send")
             return
         
+        # The bus is slow and every transmission makes the ESP32 parse and
+        # redraw, so skip it when it already has this data (but resend now
+        # and then in case the ESP32 rebooted and lost it)
+        content_hash = self._esp32_content_hash()
+        if (not force and content_hash == self._last_i2c_hash
+                and time.monotonic() - self._last_i2c_transmit < self.I2C_KEEPALIVE_INTERVAL):
+            print("✓ ESP32 already has the current data - skipping I2C transmission")
+            return
+        
         # Initialize I2C if needed
         if not self._ensure_i2c_initialized():
             print("✗ I2C not available — cannot reach ESP32 (it renders the B&W panel)")
@@ -513,9 +898,10 @@ class DisplayService:
             # Wait a moment to ensure ESP32 is ready for new transmission
             time.sleep(0.1)
             
-            # Send data in smaller chunks for better reliability
-            # Use 15 bytes per chunk to ensure reliable transmission
-            chunk_size = 15
+            # Send data in chunks that fill (but never overflow) the ESP32's
+            # Wire receive buffer, one plain I2C write per chunk. The buffer
+            # holds a whole message, so this normally is a single transaction
+            chunk_size = I2C_CHUNK_SIZE
             total_chunks = (len(data) + chunk_size - 1) // chunk_size
             print(f"Sending {total_chunks} chunks of max {chunk_size} bytes each...")
             
@@ -533,16 +919,15 @@ class DisplayService:
                 
                 for retry in range(max_chunk_retries):
                     try:
-                        # Send JSON data directly without register byte prefix
-                        # Use write_i2c_block_data with register 0x00 to avoid 0xFF corruption
-                        chunk_list = list(chunk)
-                        self.i2c_bus.write_i2c_block_data(ESP32_I2C_ADDRESS, 0x00, chunk_list)
+                        # Raw write without the SMBus register byte and 32 byte
+                        # block limit of write_i2c_block_data
+                        self.i2c_bus.i2c_rdwr(smbus2.i2c_msg.write(ESP32_I2C_ADDRESS, chunk))
                         chunk_sent = True
                         chunks_sent += 1
                         total_bytes_sent += actual_chunk_size
                         
                         if chunks_sent % 5 == 0:  # Progress every 5 chunks
-                            print(f"Progress: {chunks_sent}/{total_chunks} chunks sent ({total_bytes_sent} bytes)")
+                            logger.debug("Progress: %d/%d chunks sent (%d bytes)", chunks_sent, total_chunks, total_bytes_sent)
                         
                         break  # Success, exit retry loop
                         
@@ -557,14 +942,19 @@ class DisplayService:
                     print("✗ Stopping transmission due to chunk failure")
                     break
                 
-                # Longer delay between chunks for ESP32 processing  
-                time.sleep(0.05)  # 50ms delay between chunks for more reliable transmission
+                # Give the ESP32 time to drain its receive buffer before the
+                # next chunk (a payload that fits in one chunk needs no pause)
+                if i + chunk_size < len(data):
+                    time.sleep(0.02)
             
             print(f"✓ Transmission completed: {chunks_sent}/{total_chunks} chunks sent ({total_bytes_sent} total bytes)")
             
             # If transmission was incomplete, wait and check ESP32 status
             if chunks_sent < total_chunks:
                 print(f"⚠ Incomplete transmission! Only {chunks_sent}/{total_chunks} chunks sent")
+            else:
+                self._last_i2c_hash = content_hash
+                self._last_i2c_transmit = time.monotonic()
             
             # Give ESP32 time to process all chunks before status check
             time.sleep(0.1)
@@ -584,23 +974,20 @@ class DisplayService:
         except Exception as e:
             print(f"✗ I2C communication failed: {e}")
     
+    def _esp32_content_hash(self) -> str:
+        """Hash of the cached data the ESP32 payload is built from"""
+        content = json.dumps([self.cached_weather_data, self.cached_calendar_data], sort_keys=True, separators=(',', ':'))
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+    
     def _prepare_esp32_data(self):
         """Prepare JSON data for ESP32 communication"""
-        print(f"Preparing modern enhanced JSON data for ESP32")
-        print(f"Weather - Current: {self.cached_weather_data['current_temperature']}°C, Today: {self.cached_weather_data['today_min']}-{self.cached_weather_data['today_max']}°C")
-        print(f"Modern data - Humidity: {self.cached_weather_data.get('humidity', 0)}%, Wind: {self.cached_weather_data.get('wind_speed', 0)}m/s")
-        
-        # Prepare events data - only send the events we have
-        events_data = []
-        for i, event in enumerate(self.cached_calendar_data[:6]):  # Limit to 6 events
-            event_data = {
-                "title": self._sanitize_text_for_display(event['title'])[:63],  # Limit title length
-                "location": self._sanitize_text_for_display(event['location']) if event['location'] != 'None' else '',
-                "start_time": event['start_time'],
-                "valid": event['valid'],
-                "all_day": bool(event.get('all_day', False)),
-            }
-            events_data.append(event_data)
+        logger.debug("Weather - Current: %s°C, Today: %s-%s°C, Humidity: %s%%, Wind: %sm/s",
+                     self.cached_weather_data['current_temperature'], self.cached_weather_data['today_min'],
+                     self.cached_weather_data['today_max'], self.cached_weather_data.get('humidity', 0),
+                     self.cached_weather_data.get('wind_speed', 0))
+        
+        # Events were sanitized and truncated once when they were cached
+        events_data = self.cached_calendar_data[:6]  # Limit to 6 events
         
         # Create complete data structure with enhanced weather
         json_data = {
@@ -632,10 +1019,8 @@ class DisplayService:
         json_string = json.dumps(json_data, separators=(',', ':'))  # Compact JSON
         json_bytes = json_string.encode('utf-8')
         
-        print(f"JSON data prepared: {len(json_bytes)} bytes")
-        print(f"Event count: {len(events_data)}")
-        print(f"Data hash: {data_hash}")
-        print(f"JSON preview (first 100 chars): {json_string[:100]}...")
+        print(f"JSON data prepared: {len(json_bytes)} bytes, {len(events_data)} events")
+        logger.debug("Data hash: %s, JSON preview (first 100 chars): %s...", data_hash, json_string[:100])
         
         return json_bytes
     
@@ -644,42 +1029,9 @@ class DisplayService:
         if not text:
             return text
         
-        # Replace German umlauts and special characters
-        replacements = {
-            'ä': 'ae',
-            'ö': 'oe', 
-            'ü': 'ue',
-            'Ä': 'Ae',
-            'Ö': 'Oe',
-            'Ü': 'Ue',
-            'ß': 'ss',
-            'é': 'e',
-            'è': 'e',
-            'ê': 'e',
-            'á': 'a',
-            'à': 'a',
-            'â': 'a',
-            'í': 'i',
-            'ì': 'i',
-            'î': 'i',
-            'ó': 'o',
-            'ò': 'o',
-            'ô': 'o',
-            'ú': 'u',
-            'ù': 'u',
-            'û': 'u',
-            'ç': 'c',
-            'ñ': 'n'
-        }
-        
-        sanitized = text
-        for char, replacement in replacements.items():
-            sanitized = sanitized.replace(char, replacement)
-        
-        # Remove any remaining non-ASCII characters
-        sanitized = ''.join(char if ord(char) < 128 else '?' for char in sanitized)
-        
-        return sanitized
+        # Replace German umlauts and accents in one pass, then any remaining
+        # non-ASCII character with '?'
+        return text.translate(_DISPLAY_CHAR_MAP).encode('ascii', 'replace').decode('ascii')
     
     def _calculate_data_hash(self, json_data: dict) -> str:
         """Calculate a hash of the JSON data for change detection"""
@@ -690,17 +1042,26 @@ class DisplayService:
         hash_object = hashlib.sha256(json_string.encode('utf-8'))
         return hash_object.hexdigest()[:8]
     
-    def generate_daily_image(self) -> Image.Image:
-        """Generate AI image based on calendar events and weather"""
+    def generate_daily_image(self, use_cache: bool = True) -> Image.Image:
+        """Generate AI image based on calendar events and weather.
+
+        The result is cached for the rest of the day, keyed by the weather
+        summary and today's events, so restarts and repeated refreshes with
+        unchanged inputs don't call Gemini again. use_cache=False forces a
+        new image (the cache entry is still updated).
+        """
         print("=== Starting daily image generation ===")
         
-        # Get today's data
-        print("Fetching weather data...")
-        weather_summary = self.weather_service.get_weather_summary_for_ai()
+        # Get today's data; weather and calendar come from different
+        # services, so fetch them at the same time
+        print("Fetching weather data and calendar events...")
+        weather_future = _fetch_executor.submit(self.weather_service.get_weather_summary_for_ai)
+        events_future = _fetch_executor.submit(self.calendar_service.get_today_events)
+        
+        weather_summary = weather_future.result()
         print(f"✓ Weather summary: {weather_summary}")
         
-        print("Fetching calendar events...")
-        events = self.calendar_service.get_today_events()
+        events = events_future.result()
         print(f"✓ Found {len(events)} events for today")
         
         # Generate image with Gemini
@@ -709,12 +1070,91 @@ class DisplayService:
         if not gemini_api_key:
             raise ValueError("Gemini API key is required for image generation")
             
+        cache_key = self._image_cache_key(weather_summary, events)
+        if use_cache:
+            cached_image = self._load_cached_image(cache_key)
+            if cached_image:
+                print(f"✓ Using cached image for today's weather and events ({cache_key})")
+                self._output_image_path = self._image_cache_path(cache_key)
+                return cached_image
+            
         print("✓ Gemini API key found, attempting AI image generation...")
-        result = self._generate_gemini_image(weather_summary, events)
+        try:
+            result = self._generate_gemini_image(weather_summary, events)
+        except Exception:
+            # Better to keep showing the last image than to fail the refresh
+            stale_path = self._latest_cached_image_path()
+            stale_image = self._load_cached_image(os.path.splitext(os.path.basename(stale_path))[0]) if stale_path else None
+            if stale_image is None:
+                raise
+            print(f"⚠ Image generation failed, using the most recent cached image ({stale_path})")
+            self._output_image_path = stale_path
+            return stale_image
         print("✓ AI image generation completed successfully")
+        self._store_cached_image(cache_key, result)
+        self._output_image_path = self._image_cache_path(cache_key)
         return result
     
-    def _generate_gemini_image(self, weather_summary: str, events: List[Dict]) -> Image.Image:
+    def _image_cache_key(self, weather_summary: str, events: List[Event]) -> str:
+        """Build the image cache key from today's date and the prompt inputs.
+
+        Text is case-folded and whitespace-collapsed and events are sorted,
+        so cosmetic differences between fetches still hit the same entry.
+        """
+        def normalize(text) -> str:
+            return ' '.join(str(text or '').casefold().split())
+        
+        event_keys = sorted(
+            (normalize(event.title), normalize(event.location), str(event.start or ''))
+            for event in events
+        )
+        material = json.dumps([normalize(weather_summary), event_keys])
+        digest = hashlib.sha256(material.encode('utf-8')).hexdigest()[:16]
+        return f"{datetime.now().strftime('%Y-%m-%d')}_{digest}"
+    
+    def _image_cache_path(self, cache_key: str) -> str:
+        """Get the file an image cache entry is stored in"""
+        return os.path.join(IMAGE_CACHE_DIR, f"{cache_key}.png")
+    
+    def _latest_cached_image_path(self) -> Optional[str]:
+        """Get the most recently written image in the cache, if any"""
+        try:
+            candidates = [os.path.join(IMAGE_CACHE_DIR, f) for f in os.listdir(IMAGE_CACHE_DIR) if f.endswith('.png')]
+        except OSError:
+            return None
+        return max(candidates, key=os.path.getmtime, default=None)
+    
+    def _load_cached_image(self, cache_key: str) -> Optional[Image.Image]:
+        """Load a cached image, or None if there is no usable entry"""
+        path = self._image_cache_path(cache_key)
+        try:
+            if os.path.exists(path):
+                with Image.open(path) as cached_image:
+                    # Keep 'P' mode images (and their palette indices) as they are
+                    if cached_image.mode in ('P', 'RGB'):
+                        return cached_image.copy()
+                    return cached_image.convert('RGB')
+        except Exception as e:
+            print(f"✗ Could not read cached image {path}: {e}")
+        return None
+    
+    def _store_cached_image(self, cache_key: str, image: Image.Image):
+        """Store an image in the cache and drop entries from previous days"""
+        today_prefix = cache_key.split('_', 1)[0]
+        try:
+            os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+            # Written under a temporary name first, so a crash or power cut
+            # never leaves a truncated entry that looks like a cache hit
+            path = self._image_cache_path(cache_key)
+            image.save(path + '.tmp', format='PNG')
+            os.replace(path + '.tmp', path)
+            for filename in os.listdir(IMAGE_CACHE_DIR):
+                if not filename.startswith(today_prefix):
+                    os.remove(os.path.join(IMAGE_CACHE_DIR, filename))
+        except Exception as e:
+            print(f"✗ Could not update image cache: {e}")
+    
+    def _generate_gemini_image(self, weather_summary: str, events: List[Event]) -> Image.Image:
         """Generate image using Gemini API with two-step process"""
         gemini_api_key = self.config_service.get('gemini_api_key')
         print(f"Starting Gemini image generation process...")
@@ -726,84 +1166,93 @@ class DisplayService:
         print(f"Step 1: Generating detailed prompt with Gemini 3.5 Flash...")
         
         try:
-            # Configure the new Gemini client
-            client = genai.Client(
-                api_key=gemini_api_key,
-                http_options=types.HttpOptions(timeout=300_000)
-            )
-
+            # Imported here so the web process doesn't load the SDK until an
+            # image is actually generated
+            from google.genai import types
+            
+            client = self._get_genai_client(gemini_api_key)
             print(f"Gemini client configured successfully")
             
-            # Generate the detailed prompt with retry logic
-            print(f"Calling Gemini 3.5 Flash for prompt generation...")
-            prompt_response = self._retry_gemini_api_call(
-                client.models.generate_content,
-                model="gemini-3.5-flash",
-                contents=[prompt_generation_text],
-                config=types.GenerateContentConfig(
-                    thinking_config=types.ThinkingConfig(thinking_level="high")
+            if self.config_service.get('ai_single_step_generation', False):
+                # Skip the separate prompt-writing round trip and let the image
+                # model work from the prompt request itself
+                print(f"Single-step generation enabled, skipping prompt generation")
+                image_contents = [prompt_generation_text]
+                system_instruction = (
+                    "The user message asks for a prompt for an image generator. "
+                    "Do not answer with the prompt; generate the image it would describe instead."
                 )
-            )
-            
-            detailed_prompt = prompt_response.text.strip()
-            print(f"✓ Step 1 completed - Generated prompt: {detailed_prompt}")
+            else:
+                # Generate the detailed prompt with retry logic
+                print(f"Calling Gemini 3.5 Flash for prompt generation...")
+                prompt_response = self._retry_gemini_api_call(
+                    client.models.generate_content,
+                    model="gemini-3.5-flash",
+                    contents=[prompt_generation_text],
+                    config=types.GenerateContentConfig(
+                        thinking_config=types.ThinkingConfig(thinking_level="high")
+                    )
+                )
+                
+                detailed_prompt = prompt_response.text.strip()
+                print(f"✓ Step 1 completed - Generated prompt: {detailed_prompt}")
+                print(f"Using prompt: {detailed_prompt[:100]}...")
+                image_contents = [detailed_prompt]
+                system_instruction = None
             
             # Step 2: Generate image using the detailed prompt with retry logic
             print(f"Step 2: Generating image with Gemini 3.1 Flash Image (Nano Banana 2)...")
-            print(f"Using prompt: {detailed_prompt[:100]}...")
             
             image_response = self._retry_gemini_api_call(
                 client.models.generate_content,
                 model="gemini-3.1-flash-image",
-                contents=[detailed_prompt],
+                contents=image_contents,
                 config=types.GenerateContentConfig(
+                    system_instruction=system_instruction,
                     image_config=types.ImageConfig(image_size="1K")
                 )
             )
             
             print(f"✓ Gemini API call completed, processing response...")
-            print(f"Response object type: {type(image_response)}")
-            print(f"Response candidates count: {len(image_response.candidates) if hasattr(image_response, 'candidates') else 'No candidates'}")
+            logger.debug("Response candidates count: %s", len(image_response.candidates) if getattr(image_response, 'candidates', None) else 0)
             
             if hasattr(image_response, 'candidates') and image_response.candidates:
                 candidate = image_response.candidates[0]
-                print(f"First candidate content parts count: {len(candidate.content.parts) if hasattr(candidate.content, 'parts') else 'No parts'}")
+                logger.debug("First candidate content parts count: %s", len(candidate.content.parts) if hasattr(candidate.content, 'parts') else 0)
                 
                 # Extract and process the generated image
                 for i, part in enumerate(candidate.content.parts):
-                    print(f"Processing part {i+1}: type={type(part)}")
                     if hasattr(part, 'inline_data') and part.inline_data is not None:
-                        print(f"✓ Found inline image data in part {i+1}")
-                        print(f"Image data size: {len(part.inline_data.data)} bytes")
-                        print(f"Image mime type: {getattr(part.inline_data, 'mime_type', 'unknown')}")
+                        logger.debug("Inline image data in part %d: %d bytes, %s", i + 1, len(part.inline_data.data),
+                                     getattr(part.inline_data, 'mime_type', 'unknown'))
                         
                         try:
                             image = Image.open(BytesIO(part.inline_data.data))
+                            # Lets libjpeg scale JPEG responses while decoding; no-op for PNG
+                            image.draft('RGB', (self.COLOR_WIDTH * 2, self.COLOR_HEIGHT * 2))
                             print(f"✓ Image loaded successfully: {image.size[0]}x{image.size[1]} pixels, mode: {image.mode}")
                             
-                            # Resize and crop to fit 800x480 display
-                            print(f"Resizing and cropping image to {self.COLOR_WIDTH}x{self.COLOR_HEIGHT}...")
-                            resized_image = self._resize_and_crop_image(image, self.COLOR_WIDTH, self.COLOR_HEIGHT)
-                            print(f"✓ Image resized successfully")
+                            # Resize and crop to fit 800x480 display. Rebinding
+                            # the name frees the full-size decode before dithering
+                            image = self._resize_and_crop_image(image, self.COLOR_WIDTH, self.COLOR_HEIGHT)
+                            logger.debug("Image resized and cropped to %dx%d", self.COLOR_WIDTH, self.COLOR_HEIGHT)
                             
                             # Apply Floyd-Steinberg dithering for e-ink display
-                            print(f"Applying Floyd-Steinberg dithering...")
-                            dithered_image = self._apply_floyd_steinberg_dithering(resized_image)
-                            print(f"✓ Dithering completed successfully")
+                            dithered_image = self._apply_floyd_steinberg_dithering(image)
                             
-                            # Save debug copy
-                            dithered_image.save('debug_generated_image.png')
-                            print(f"✓ Debug image saved as debug_generated_image.png")
+                            # The image cache entry doubles as the preview, so
+                            # only write a separate debug copy when asked to
+                            if DEBUG_SAVE_IMAGES:
+                                dithered_image.save('debug_generated_image.png', compress_level=1)
+                                print(f"✓ Debug image saved as debug_generated_image.png")
                             
                             return dithered_image
                             
                         except Exception as img_error:
                             print(f"✗ Error processing image data: {img_error}")
                             continue
-                    else:
-                        print(f"Part {i+1} has no inline_data or inline_data is None")
-                        if hasattr(part, 'text'):
-                            print(f"Part {i+1} contains text: {part.text[:100]}...")
+                    elif getattr(part, 'text', None):
+                        logger.debug("Part %d contains text: %s...", i + 1, part.text[:100])
             else:
                 print(f"✗ No candidates found in response")
             
@@ -812,12 +1261,22 @@ class DisplayService:
             raise RuntimeError("Failed to generate image from Gemini API response")
             
         except Exception as e:
-            print(f"✗ Gemini image generation error: {e}")
-            print(f"Exception type: {type(e)}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.exception("✗ Gemini image generation error (%s): %s", type(e).__name__, e)
             raise
     
+    def _get_genai_client(self, api_key: str):
+        """Get the Gemini client, reusing it (and its connection pool) until the API key changes"""
+        if self._genai_client is None or self._genai_client_key != api_key:
+            from google import genai
+            from google.genai import types
+            
+            self._genai_client = genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(timeout=300_000)
+            )
+            self._genai_client_key = api_key
+        return self._genai_client
+    
     # Matches {random:a|b|c} placeholders. The body may contain spaces, commas
     # and pipes, but no braces, so it never swallows other {variable} fields.
     _RANDOM_PLACEHOLDER_RE = re.compile(r'\{random:([^{}]+)\}', re.IGNORECASE)
@@ -864,7 +1323,7 @@ class DisplayService:
 
         return self._RANDOM_PLACEHOLDER_RE.sub(_pick, text)
 
-    def _create_prompt_generation_request(self, weather_summary: str, events: List[Dict]) -> str:
+    def _create_prompt_generation_request(self, weather_summary: str, events: List[Event]) -> str:
         """Create the prompt generation request for Gemini"""
         # Get today's date
         today_date = datetime.now().strftime("%Y-%m-%d")
@@ -873,14 +1332,14 @@ class DisplayService:
         event_texts = []
         if events:
             for event in events[:3]:  # Limit to 3 events
-                if event['title']:
-                    event_text = event['title']
-                    if event['location']:
-                        event_text += f" ({event['location']})"
+                if event.title:
+                    event_text = event.title
+                    if event.location:
+                        event_text += f" ({event.location})"
                     # Add time if available
-                    if event.get('start'):
+                    if event.start:
                         try:
-                            time_str = event['start'].strftime("%I%p").lower()
+                            time_str = event.start.strftime("%I%p").lower()
                             event_text += f" {time_str}"
                         except:
                             pass
@@ -910,50 +1369,56 @@ class DisplayService:
     
     def _resize_and_crop_image(self, image: Image.Image, target_width: int, target_height: int) -> Image.Image:
         """Resize and crop image to fit target dimensions, cropping from center"""
-        # Calculate the aspect ratios
-        original_width, original_height = image.size
-        target_ratio = target_width / target_height
-        original_ratio = original_width / original_height
-        
-        if original_ratio > target_ratio:
-            # Image is wider than target, crop width from center
-            new_height = original_height
-            new_width = int(original_height * target_ratio)
-            left = (original_width - new_width) // 2
-            top = 0
-            right = left + new_width
-            bottom = original_height
-        else:
-            # Image is taller than target, crop height from center
-            new_width = original_width
-            new_height = int(original_width / target_ratio)
-            left = 0
-            top = (original_height - new_height) // 2
-            right = original_width
-            bottom = top + new_height
-        
-        # Crop the image from center
-        cropped_image = image.crop((left, top, right, bottom))
+        # Shrink very large sources by an integer factor first (a cheap box
+        # filter), keeping at least twice the target size for the final pass
+        factor = min(image.width // (2 * target_width), image.height // (2 * target_height))
+        if factor >= 2:
+            image = image.reduce(factor)
         
-        # Resize to exact target dimensions
-        final_image = cropped_image.resize((target_width, target_height), Image.Resampling.LANCZOS)
-        
-        return final_image
+        # fit() resamples straight from the centered crop box, without first
+        # copying the cropped region into an intermediate image
+        return ImageOps.fit(image, (target_width, target_height), method=Image.Resampling.LANCZOS, centering=(0.5, 0.5))
     
     def _apply_floyd_steinberg_dithering(self, image: Image.Image) -> Image.Image:
-        """Apply highly optimized vectorized Floyd-Steinberg dithering for e-ink display"""
-        import time
+        """Apply Floyd-Steinberg dithering to the e-ink palette using Pillow's C quantizer"""
         start_time = time.time()
         
-        # Define the 6 colors supported by the e-ink display (RGB values)
-        eink_colors = np.array([
-            [0, 0, 0],       # Black
-            [255, 255, 255], # White
-            [255, 0, 0],     # Red
-            [0, 255, 0],     # Green
-            [0, 0, 255],     # Blue
-            [255, 255, 0],   # Yellow
-        ], dtype=np.float32)
+        # Convert image to RGB if not already
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
+        if DITHER_BACKEND == 'numba' and NUMBA_AVAILABLE:
+            width, height = image.size
+            print(f"Starting JIT Floyd-Steinberg dithering on {width}x{height} image...")
+            src = np.asarray(image, dtype=np.uint8)
+            out = np.empty(src.shape[:2], dtype=np.uint8)
+            _floyd_steinberg_kernel(src, _get_palette_array(), _get_palette_lut(), _get_palette_indices(), out)
+            # Same 'P' image the Pillow backend produces, so the framebuffer
+            # is packed straight from these indices
+            dithered_image = Image.fromarray(out, 'P')
+            dithered_image.putpalette(_get_palette_image().getpalette())
+        elif DITHER_BACKEND in ('numpy', 'numba'):
+            dithered_image = self._apply_floyd_steinberg_dithering_numpy(image)
+        else:
+            width, height = image.size
+            print(f"Starting Floyd-Steinberg dithering on {width}x{height} image...")
+            # Kept in 'P' mode: the palette indices are exactly what the panel
+            # takes, so the framebuffer can be packed without another pass
+            dithered_image = image.quantize(
+                palette=_get_palette_image(),
+                dither=Image.Dither.FLOYDSTEINBERG
+            )
+        
+        end_time = time.time()
+        print(f"✓ Dithering completed in {end_time - start_time:.2f} seconds")
+        
+        return dithered_image
+    
+    def _apply_floyd_steinberg_dithering_numpy(self, image: Image.Image) -> Image.Image:
+        """Reference NumPy implementation of the Floyd-Steinberg dithering (DITHER_BACKEND=numpy)"""
+        # The 6 colors supported by the e-ink display (RGB values)
+        eink_colors = _get_palette_array()
+        eink_colors_sq = np.einsum('ij,ij->i', eink_colors, eink_colors)
         
         # Pre-compute Floyd-Steinberg weights as constants
         WEIGHT_RIGHT = 7.0 / 16.0      # 0.4375
@@ -961,14 +1426,14 @@ class DisplayService:
         WEIGHT_BOTTOM = 5.0 / 16.0      # 0.3125
         WEIGHT_BOTTOM_RIGHT = 1.0 / 16.0 # 0.0625
         
-        # Convert image to RGB if not already
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
         # Convert to numpy array for easier manipulation
         img_array = np.array(image, dtype=np.float32)
         height, width = img_array.shape[:2]
         
+        # Panel color index of every pixel, filled in row by row
+        panel_indices = _get_palette_indices()
+        out = np.empty((height, width), dtype=np.uint8)
+        
         print(f"Starting vectorized Floyd-Steinberg dithering on {width}x{height} image...")
         
         # Highly optimized Floyd-Steinberg dithering
@@ -977,20 +1442,19 @@ class DisplayService:
             # Process entire row pixels for closest color finding (vectorized)
             row_pixels = img_array[y].reshape(-1, 3)  # Shape: (width, 3)
             
-            # Vectorized distance calculation for entire row
-            # Broadcasting: (width, 1, 3) - (1, 6, 3) -> (width, 6, 3) -> (width, 6)
-            pixel_distances = np.sum((row_pixels[:, np.newaxis, :] - eink_colors[np.newaxis, :, :]) ** 2, axis=2)
+            # Vectorized distance calculation for entire row, expanded as
+            # |p|^2 - 2 p.c + |c|^2 so no (width, 6, 3) temporary is built.
+            # |p|^2 is the same for every color and doesn't change the argmin
+            pixel_distances = eink_colors_sq[np.newaxis, :] - 2.0 * (row_pixels @ eink_colors.T)
             closest_indices = np.argmin(pixel_distances, axis=1)
             new_row_pixels = eink_colors[closest_indices]
+            out[y] = panel_indices[closest_indices]
             
             # Calculate quantization errors for entire row
             row_errors = row_pixels - new_row_pixels
             
             # Process each pixel in the row for error distribution
             for x in range(width):
-                # Update current pixel
-                img_array[y, x] = new_row_pixels[x]
-                
                 # Get quantization error for current pixel
                 quant_error = row_errors[x]
                 
@@ -1012,13 +1476,11 @@ class DisplayService:
                     if x + 1 < width:
                         img_array[y + 1, x + 1] += quant_error * WEIGHT_BOTTOM_RIGHT
         
-        # Clamp values to valid range and convert back to PIL Image
-        img_array = np.clip(img_array, 0, 255).astype(np.uint8)
-        
-        end_time = time.time()
-        print(f"✓ Vectorized dithering completed in {end_time - start_time:.2f} seconds")
-        
-        return Image.fromarray(img_array, 'RGB')
+        # Same 'P' image the other backends produce, so there is no clip and
+        # uint8 copy of the float frame and no re-quantizing for the buffer
+        dithered_image = Image.fromarray(out, 'P')
+        dithered_image.putpalette(_get_palette_image().getpalette())
+        return dithered_image
     
     def _retry_gemini_api_call(self, func, *args, max_retries=3, initial_delay=1.0, **kwargs):
         """
@@ -1037,6 +1499,9 @@ class DisplayService:
         Raises:
             The last exception encountered if all retries fail
         """
+        # httpx comes with the Gemini SDK, so import it along with the SDK
+        import httpx
+        
         last_exception = None
         delay = initial_delay
         
@@ -16,6 +16,11 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# SPI clock for the display. Waveshare's driver uses a conservative 4 MHz;
+# the frame transfer time scales with it, so default to 10 MHz and let
+# setups with long or noisy wiring back off via the environment
+SPI_MAX_SPEED_HZ = int(os.getenv('SPI_MAX_SPEED_HZ', '10000000'))
+
 # Pin definition (module level for compatibility)
 RST_PIN  = 17
 DC_PIN   = 25
@@ -52,26 +57,12 @@ class RaspberryPi:
         print("GPIO pins initialized with RPi.GPIO")
 
     def digital_write(self, pin, value):
-        if pin == self.RST_PIN:
-            GPIO.output(self.RST_PIN, GPIO.HIGH if value else GPIO.LOW)
-        elif pin == self.DC_PIN:
-            GPIO.output(self.DC_PIN, GPIO.HIGH if value else GPIO.LOW)
-        elif pin == self.CS_PIN:
-            GPIO.output(self.CS_PIN, GPIO.HIGH if value else GPIO.LOW)
-        elif pin == self.PWR_PIN:
-            GPIO.output(self.PWR_PIN, GPIO.HIGH if value else GPIO.LOW)
+        # Called for every command and data byte the driver sends, so go
+        # straight to RPi.GPIO (which takes any BCM pin) without dispatching
+        GPIO.output(pin, GPIO.HIGH if value else GPIO.LOW)
 
     def digital_read(self, pin):
-        if pin == self.BUSY_PIN:
-            return GPIO.input(self.BUSY_PIN)
-        elif pin == self.RST_PIN:
-            return GPIO.input(self.RST_PIN)
-        elif pin == self.DC_PIN:
-            return GPIO.input(self.DC_PIN)
-        elif pin == self.CS_PIN:
-            return GPIO.input(self.CS_PIN)
-        elif pin == self.PWR_PIN:
-            return GPIO.input(self.PWR_PIN)
+        return GPIO.input(pin)
 
     def delay_ms(self, delaytime):
         time.sleep(delaytime / 1000.0)
@@ -80,6 +71,11 @@ class RaspberryPi:
         self.SPI.writebytes(data)
 
     def spi_writebyte2(self, data):
+        # The waveshare driver hands over the whole framebuffer as a Python
+        # list. Convert it to bytes in one C-level pass so writebytes2 can
+        # stream it straight from the buffer in bufsiz-sized transfers.
+        if isinstance(data, list):
+            data = bytes(data)
         self.SPI.writebytes2(data)
 
     def module_init(self, cleanup=False):
@@ -105,9 +101,9 @@ class RaspberryPi:
             # SPI device, bus = 0, device = 0
             try:
                 self.SPI.open(0, 0)
-                self.SPI.max_speed_hz = 4000000
+                self.SPI.max_speed_hz = SPI_MAX_SPEED_HZ
                 self.SPI.mode = 0b00
-                print("SPI initialized successfully")
+                print(f"SPI initialized successfully at {SPI_MAX_SPEED_HZ / 1e6:g} MHz")
             except Exception as e:
                 print(f"SPI initialization failed: {e}")
                 return -1
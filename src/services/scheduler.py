@@ -1,17 +1,67 @@
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timedelta
 import threading
-from src.services.config_service import ConfigService
-from src.services.display_service import DisplayService
+from src.services.config_service import config_service
 
 class SchedulerService:
+    # Fire the daily color refresh up to this many seconds late, so it doesn't
+    # hit the weather and Gemini APIs exactly on the minute along with everyone
+    # else. The B&W refresh isn't jittered: its data cache is sized to the
+    # fixed 30 minute period, and a random offset would make runs randomly
+    # reuse the previous run's data
+    REFRESH_JITTER = 120
+    
+    # A second scheduler would run every job twice against the same panels,
+    # so all callers share one instance
+    _instance = None
+    _instance_lock = threading.Lock()
+    
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+    
     def __init__(self):
-        self.scheduler = BackgroundScheduler()
-        self.config_service = ConfigService()
-        self.display_service = DisplayService()
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self._initialized = True
+        
+        # Color refreshes (AI generation and a ~30s panel update) get their
+        # own worker so they never hold up a B&W refresh. A job misfires when
+        # the scheduler thread only gets to it after its (jittered) run time:
+        # on the Pi Zero that happens while dithering keeps the CPU and GIL
+        # busy, and when NTP steps the clock of the RTC-less Pi after boot.
+        # APScheduler's default grace of 1s would silently drop those runs
+        self.scheduler = BackgroundScheduler(
+            executors={'default': ThreadPoolExecutor(2), 'color': ThreadPoolExecutor(1)},
+            job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': 300}
+        )
+        self.config_service = config_service
+        self._display_service = None
         self.running = False
+        
+        # Manual refreshes requested through the API, keyed by job id
+        self.manual_refreshes = {}
+        self.manual_refreshes_lock = threading.Lock()
+    
+    @property
+    def display_service(self):
+        """The shared DisplayService, imported and created on first use.
+        
+        Importing the display stack (PIL, numpy, the panel drivers) takes
+        seconds on a Pi Zero, so it's left to the first refresh instead of
+        holding up the web server's start.
+        """
+        if self._display_service is None:
+            from src.services.display_service import DisplayService
+            self._display_service = DisplayService()
+        return self._display_service
     
     def start(self):
         """Start the scheduler"""
@@ -60,9 +110,10 @@ class SchedulerService:
             hour, minute = map(int, color_refresh_time.split(':'))
             self.scheduler.add_job(
                 func=self._refresh_color_display,
-                trigger=CronTrigger(hour=hour, minute=minute),
+                trigger=CronTrigger(hour=hour, minute=minute, jitter=self.REFRESH_JITTER),
                 id='color_display_refresh',
                 name='Refresh Color Display',
+                executor='color',
                 replace_existing=True
             )
         except ValueError:
@@ -98,6 +149,7 @@ class SchedulerService:
             run_date=run_time,
             id='initial_color_refresh',
             name='Initial Color Display Refresh',
+            executor='color',
             replace_existing=True
         )
         
@@ -135,11 +187,67 @@ class SchedulerService:
         """Refresh color display"""
         try:
             print(f"[{datetime.now()}] Refreshing color display...")
-            self.display_service.update_color_display()
+            # Clear the panel once a day, with the scheduled refresh, against ghosting
+            self.display_service.update_color_display(force_clear=True)
             print("Color display refresh completed")
         except Exception as e:
             print(f"Color display refresh failed: {e}")
     
+    def submit_display_refresh(self, display_type: str, use_cache: bool = True) -> str:
+        """Queue a manual display refresh and return its job id.
+        
+        A request for a display type that is already queued or running
+        returns the existing job instead of scheduling another one.
+        """
+        job_id = f"manual_refresh_{display_type}"
+        with self.manual_refreshes_lock:
+            job = self.manual_refreshes.get(job_id)
+            if job and job['status'] in ('queued', 'running'):
+                return job_id
+            self.manual_refreshes[job_id] = {
+                'id': job_id,
+                'type': display_type,
+                'status': 'queued',
+                'result': None,
+                'submitted_at': datetime.now().isoformat(),
+                'finished_at': None
+            }
+        
+        self.scheduler.add_job(
+            func=self._run_manual_refresh,
+            args=[job_id, display_type, use_cache],
+            id=job_id,
+            name=f'Manual {display_type} Display Refresh',
+            executor='color' if display_type == 'color' else 'default',
+            replace_existing=True
+        )
+        return job_id
+    
+    def get_display_refresh(self, job_id: str):
+        """Get the state of a manual display refresh"""
+        with self.manual_refreshes_lock:
+            job = self.manual_refreshes.get(job_id)
+            return dict(job) if job else None
+    
+    def _run_manual_refresh(self, job_id: str, display_type: str, use_cache: bool):
+        """Run a queued manual refresh and record its outcome"""
+        with self.manual_refreshes_lock:
+            self.manual_refreshes[job_id]['status'] = 'running'
+        
+        try:
+            result = self.display_service.refresh_display(display_type, use_cache=use_cache)
+            status = 'finished' if result['success'] else 'failed'
+        except Exception as e:
+            result = {'success': False, 'messages': [str(e)]}
+            status = 'failed'
+        
+        with self.manual_refreshes_lock:
+            self.manual_refreshes[job_id].update({
+                'status': status,
+                'result': result,
+                'finished_at': datetime.now().isoformat()
+            })
+    
     def update_schedule(self):
         """Update scheduler with new configuration"""
         if self.running:
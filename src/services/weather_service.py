@@ -1,10 +1,45 @@
 import requests
+import threading
+import time
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, List
-from src.services.config_service import ConfigService
+from urllib3.util.retry import Retry
+from src.services.config_service import config_service
+
+def _build_session() -> requests.Session:
+    """Pool keep-alive connections to OpenWeather and retry transient failures"""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+    # A B&W refresh fetches current weather and the forecast concurrently
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
 class WeatherService:
+    # Shared session keeps the TLS/TCP connection to OpenWeather alive
+    # between calls instead of reconnecting for every request
+    _session = _build_session()
+
+    # A full refresh asks for current weather three times and the forecast
+    # twice, while OpenWeather updates current conditions about every 10
+    # minutes and the 3-hourly forecast only a few times a day
+    RESPONSE_CACHE_TTL = {'weather': 600, 'forecast': 3600}
+    # When OpenWeather can't be reached, an older response is still better
+    # than placeholders (which would also change the AI image prompt)
+    RESPONSE_STALE_TTL = 21600  # 6 hours
+    _response_cache = {}
+    _response_cache_lock = threading.Lock()
+
+    # After this many failed requests in a row, stop calling OpenWeather for
+    # a while instead of waiting out the timeout (and retries) every time
+    FAILURE_THRESHOLD = 3
+    FAILURE_COOLDOWN = 300  # 5 minutes
+    _consecutive_failures = 0
+    _unavailable_until = 0.0
+
     def __init__(self):
-        self.config_service = ConfigService()
+        self.config_service = config_service
         self.base_url = "http://api.openweathermap.org/data/2.5"
     
     def _get_api_key(self) -> str:
@@ -24,14 +59,58 @@ class WeatherService:
         params['appid'] = self._get_api_key()
         params['units'] = 'metric'  # Use Celsius
         
+        cache_key = (endpoint, tuple(sorted(params.items())))
+        with self._response_cache_lock:
+            cached = self._response_cache.get(cache_key)
+        # Never serve a response from before midnight: the forecast's first
+        # day would still be yesterday
+        if (cached and time.time() - cached[0] < self.RESPONSE_CACHE_TTL.get(endpoint, 300)
+                and time.localtime(cached[0]).tm_yday == time.localtime().tm_yday):
+            return cached[1]
+        
+        if time.time() < WeatherService._unavailable_until:
+            return self._stale_response(endpoint, cached, "OpenWeather unavailable, not retrying yet")
+        
         url = f"{self.base_url}/{endpoint}"
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = self._session.get(url, params=params, timeout=10)
             response.raise_for_status()
-            return response.json()
+            data = response.json()
         except requests.RequestException as e:
-            raise Exception(f"Weather API request failed: {str(e)}")
+            # 4xx means a bad API key or location, not an outage; backing off
+            # would only delay the request after the config is fixed
+            client_error = (isinstance(e, requests.HTTPError) and e.response is not None
+                            and 400 <= e.response.status_code < 500)
+            if not client_error:
+                with self._response_cache_lock:
+                    WeatherService._consecutive_failures += 1
+                    if WeatherService._consecutive_failures >= self.FAILURE_THRESHOLD:
+                        WeatherService._unavailable_until = time.time() + self.FAILURE_COOLDOWN
+            return self._stale_response(endpoint, cached, f"Weather API request failed: {str(e)}")
+        
+        with self._response_cache_lock:
+            self._response_cache[cache_key] = (time.time(), data)
+            WeatherService._consecutive_failures = 0
+        return data
+    
+    def _stale_response(self, endpoint: str, cached, error: str) -> Dict[str, Any]:
+        """Fall back to an older cached response, or raise if there is none"""
+        # A forecast from before midnight would show yesterday as today;
+        # raising lets the caller keep its last good data instead
+        if (cached and time.time() - cached[0] < self.RESPONSE_STALE_TTL
+                and (endpoint != 'forecast' or time.localtime(cached[0]).tm_yday == time.localtime().tm_yday)):
+            print(f"⚠ {error}, using cached '{endpoint}' data")
+            return cached[1]
+        raise Exception(error)
+    
+    @classmethod
+    def clear_cache(cls):
+        """Drop cached API responses so the next call hits OpenWeather"""
+        with cls._response_cache_lock:
+            cls._response_cache.clear()
+            cls._consecutive_failures = 0
+            cls._unavailable_until = 0.0
     
     def get_current_weather(self) -> Dict[str, Any]:
         """Get current weather data"""
@@ -120,32 +199,36 @@ class WeatherService:
         if not day_data:
             return {}
         
-        # Extract temperatures
-        temps = [item['main']['temp'] for item in day_data]
-        
-        # Find the most common weather condition
+        # Aggregate everything in a single pass over the 3-hourly items
+        temp_min = temp_max = day_data[0]['main']['temp']
+        temp_sum = humidity_sum = wind_sum = 0
         weather_counts = {}
+        first_weather = {}  # First weather entry seen for each condition
         for item in day_data:
-            weather = item['weather'][0]['main']
-            weather_counts[weather] = weather_counts.get(weather, 0) + 1
-        
-        most_common_weather = max(weather_counts, key=weather_counts.get)
+            main = item['main']
+            weather = item['weather'][0]
+            temp = main['temp']
+            temp_min = min(temp_min, temp)
+            temp_max = max(temp_max, temp)
+            temp_sum += temp
+            humidity_sum += main['humidity']
+            wind_sum += item['wind']['speed']
+            weather_counts[weather['main']] = weather_counts.get(weather['main'], 0) + 1
+            first_weather.setdefault(weather['main'], weather)
         
-        # Get the corresponding description and icon
-        weather_item = next(
-            (item['weather'][0] for item in day_data if item['weather'][0]['main'] == most_common_weather),
-            day_data[0]['weather'][0]
-        )
+        # The most common weather condition, with its description and icon
+        weather_item = first_weather[max(weather_counts, key=weather_counts.get)]
+        count = len(day_data)
         
         return {
-            'temp_min': round(min(temps)),
-            'temp_max': round(max(temps)),
-            'temp_avg': round(sum(temps) / len(temps)),
-            'humidity': round(sum(item['main']['humidity'] for item in day_data) / len(day_data)),
+            'temp_min': round(temp_min),
+            'temp_max': round(temp_max),
+            'temp_avg': round(temp_sum / count),
+            'humidity': round(humidity_sum / count),
             'description': weather_item['description'].title(),
             'main': weather_item['main'],
             'icon': weather_item['icon'],
-            'wind_speed': round(sum(item['wind']['speed'] for item in day_data) / len(day_data), 1)
+            'wind_speed': round(wind_sum / count, 1)
         }
     
     def get_enhanced_weather_for_display(self) -> Dict[str, Any]:
@@ -194,6 +277,9 @@ class WeatherService:
                     'tomorrow_max': None,
                     'tomorrow_description': 'No forecast available'
                 })
+                # Flag the fallback so callers can keep an earlier, complete forecast
+                if forecast.get('error'):
+                    result['forecast_error'] = forecast['error']
             
             return result
             
@@ -129,20 +129,9 @@ def translate_weather_description(description: str) -> str:
     if not description:
         return description
     
-    # Convert to lowercase for matching
-    desc_lower = description.lower().strip()
-    
-    # Check direct match first
-    if desc_lower in WEATHER_TRANSLATIONS:
-        return WEATHER_TRANSLATIONS[desc_lower]
-    
-    # Check if it's a title-cased version
-    for key, value in WEATHER_TRANSLATIONS.items():
-        if key.lower() == desc_lower:
-            return value
-    
-    # Return original if no translation found
-    return description
+    # Keys are all lowercase, so one lookup covers any casing; return the
+    # original if no translation is found
+    return WEATHER_TRANSLATIONS.get(description.lower().strip(), description)
 
 def translate_ui_text(text: str) -> str:
     """
@@ -153,12 +142,5 @@ def translate_ui_text(text: str) -> str:
     if not text:
         return text
     
-    # Convert to lowercase for matching
-    text_lower = text.lower().strip()
-    
-    # Check direct match first
-    if text_lower in UI_TRANSLATIONS:
-        return UI_TRANSLATIONS[text_lower]
-    
-    # Return original if no translation found
-    return text
\ No newline at end of file
+    # Keys are all lowercase; return the original if no translation is found
+    return UI_TRANSLATIONS.get(text.lower().strip(), text)
\ No newline at end of file
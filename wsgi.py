@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+"""
+Paulander WSGI entry point (used by gunicorn, see gunicorn.conf.py)
+"""
+from src.main import app
+
+application = app